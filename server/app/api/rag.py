@@ -1,56 +1,62 @@
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+import numpy as np
+from fastapi import APIRouter, HTTPException, Depends, Request
 from typing import List
 from ..models.rag import (
     RAGSearchRequest, RAGSearchResponse, 
     RAGGenerateRequest, RAGGenerateResponse,
     RAGProcessRequest, RAGProcessResponse,
-    RAGListResponse
+    RAGListResponse, RAGSearchResult
 )
 from ..core.rag_service import RAGService
 from ..core.transcript_service import TranscriptService
 
 router = APIRouter()
-rag_service = RAGService()
 transcript_service = TranscriptService()
 
+def get_rag_service(request: Request) -> RAGService:
+    """The RAGService built once during app startup; see lifespan in main.py"""
+    return request.app.state.rag_service
+
+def _to_search_results(results: List[dict]) -> List[RAGSearchResult]:
+    """Wrap rag_service results without re-validating them; they are built by our own code"""
+    return [
+        RAGSearchResult.model_construct(
+            text=r["text"],
+            timestamp=r["timestamp"],
+            segment_index=r["segment_index"],
+            relevance_score=r["relevance_score"],
+            metadata=r["metadata"]
+        )
+        for r in results
+    ]
+
 @router.post("/process/{video_id}", response_model=RAGProcessResponse)
-async def process_transcript_for_rag(video_id: str, request: RAGProcessRequest = None):
+async def process_transcript_for_rag(video_id: str, request: RAGProcessRequest = None,
+                                     rag_service: RAGService = Depends(get_rag_service)):
     """Process a video's transcript data for RAG functionality"""
     try:
-
-        segments = await transcript_service.get_transcript_from_db(video_id)
+        # The transcript lookup and the collection check are independent, so run them together
+        transcript_result, already_processed = await asyncio.gather(
+            transcript_service.get_transcript(video_id),
+            asyncio.to_thread(rag_service.has_collection, video_id)
+        )
         
-
-        if not segments:
-            print(f"Transcript not found in database for {video_id}, fetching directly...")
-            transcript_result = transcript_service.extract_transcript(video_id)
-            
-            if not transcript_result["success"]:
-                return RAGProcessResponse(
-                    success=False,
-                    video_id=video_id,
-                    error=f"Could not fetch transcript: {transcript_result['error']}"
-                )
-            
-
-            formatted_segments = []
-            for segment in transcript_result["segments"]:
-                formatted_segments.append({
-                    "text": segment.text,
-                    "timestamp": segment.timestamp
-                })
-        else:
-
-            formatted_segments = []
-            for segment in segments:
-                formatted_segments.append({
-                    "text": segment.get("text", ""),
-                    "timestamp": segment.get("timestamp", 0)
-                })
+        if not transcript_result["success"]:
+            return RAGProcessResponse(
+                success=False,
+                video_id=video_id,
+                error=f"Could not fetch transcript: {transcript_result['error']}"
+            )
+        
+        segments = transcript_result["segments"]
+        texts = [segment.text for segment in segments]
+        timestamps = np.fromiter(
+            (segment.timestamp or 0 for segment in segments), dtype=np.float64, count=len(segments)
+        )
         
 
-        existing_collections = rag_service.list_video_collections()
-        if video_id in [c['name'] for c in existing_collections]:
+        if already_processed:
             if request and not request.overwrite:
                 return RAGProcessResponse(
                     success=False,
@@ -59,10 +65,10 @@ async def process_transcript_for_rag(video_id: str, request: RAGProcessRequest =
                 )
             else:
 
-                rag_service.delete_video_collection(video_id)
+                await asyncio.to_thread(rag_service.delete_video_collection, video_id)
         
 
-        result = rag_service.process_and_store_transcript(video_id, formatted_segments)
+        result = await asyncio.to_thread(rag_service.process_and_store_transcript_columns, video_id, texts, timestamps)
         
         if result["success"]:
             return RAGProcessResponse(
@@ -86,12 +92,12 @@ async def process_transcript_for_rag(video_id: str, request: RAGProcessRequest =
         )
 
 @router.post("/search/{video_id}", response_model=RAGSearchResponse)
-async def search_transcript(video_id: str, request: RAGSearchRequest):
+async def search_transcript(video_id: str, request: RAGSearchRequest,
+                            rag_service: RAGService = Depends(get_rag_service)):
     """Search for relevant segments in a video's transcript"""
     try:
 
-        existing_collections = rag_service.list_video_collections()
-        if video_id not in [c['name'] for c in existing_collections]:
+        if not rag_service.has_collection(video_id):
             return RAGSearchResponse(
                 success=False,
                 query=request.query,
@@ -107,16 +113,7 @@ async def search_transcript(video_id: str, request: RAGSearchRequest):
                 success=True,
                 query=request.query,
                 video_id=video_id,
-                results=[
-                    {
-                        "text": r["text"],
-                        "timestamp": r["timestamp"],
-                        "segment_index": r["segment_index"],
-                        "relevance_score": r["relevance_score"],
-                        "metadata": r["metadata"]
-                    }
-                    for r in result["results"]
-                ]
+                results=_to_search_results(result["results"])
             )
         else:
             return RAGSearchResponse(
@@ -135,12 +132,12 @@ async def search_transcript(video_id: str, request: RAGSearchRequest):
         )
 
 @router.post("/generate/{video_id}", response_model=RAGGenerateResponse) 
-async def generate_rag_response(video_id: str, request: RAGGenerateRequest):
+async def generate_rag_response(video_id: str, request: RAGGenerateRequest,
+                                rag_service: RAGService = Depends(get_rag_service)):
     """Generate an AI response based on transcript content"""
     try:
 
-        existing_collections = rag_service.list_video_collections()
-        if video_id not in [c['name'] for c in existing_collections]:
+        if not rag_service.has_collection(video_id):
             return RAGGenerateResponse(
                 success=False,
                 query=request.query,
@@ -150,7 +147,7 @@ async def generate_rag_response(video_id: str, request: RAGGenerateRequest):
             )
         
 
-        result = rag_service.generate_rag_response(video_id, request.query, request.top_k)
+        result = await rag_service.generate_rag_response_async(video_id, request.query, request.top_k)
         
         if result["success"]:
             return RAGGenerateResponse(
@@ -158,16 +155,7 @@ async def generate_rag_response(video_id: str, request: RAGGenerateRequest):
                 query=request.query,
                 video_id=video_id,
                 answer=result["answer"],
-                sources=[
-                    {
-                        "text": r["text"],
-                        "timestamp": r["timestamp"],
-                        "segment_index": r["segment_index"],
-                        "relevance_score": r["relevance_score"],
-                        "metadata": r["metadata"]
-                    }
-                    for r in result["sources"]
-                ],
+                sources=_to_search_results(result["sources"]),
                 retrieval_only=result.get("retrieval_only", False)
             )
         else:
@@ -189,7 +177,7 @@ async def generate_rag_response(video_id: str, request: RAGGenerateRequest):
         )
 
 @router.get("/list", response_model=RAGListResponse)
-async def list_processed_videos():
+async def list_processed_videos(rag_service: RAGService = Depends(get_rag_service)):
     """List all videos that have been processed for RAG"""
     try:
         collections = rag_service.list_video_collections()
@@ -201,7 +189,7 @@ async def list_processed_videos():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/delete/{video_id}")
-async def delete_video_rag_data(video_id: str):
+async def delete_video_rag_data(video_id: str, rag_service: RAGService = Depends(get_rag_service)):
     """Delete RAG data for a specific video"""
     try:
         success = rag_service.delete_video_collection(video_id)
@@ -217,12 +205,12 @@ async def delete_video_rag_data(video_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/health")
-async def rag_health_check():
+async def rag_health_check(rag_service: RAGService = Depends(get_rag_service)):
     try:
         video_count = len(rag_service.list_video_collections())
         embedding_model_name = getattr(rag_service.embedding_model, 'model_name', 'unknown')
         openai_available = rag_service.openai_client is not None
-        vector_store_type = "ChromaDB" if rag_service.use_chromadb else "In-Memory"
+        vector_store_type = rag_service.vector_store_type
         
         return {
             "status": "healthy",
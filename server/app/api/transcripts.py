@@ -1,11 +1,27 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-from ..models.youtube import TranscriptWithTimestampsResponse
+from ..models.youtube import TranscriptWithTimestampsResponse, BulkTranscriptRequest, BulkTranscriptResponse
 from ..core.transcript_service import TranscriptService
 
 router = APIRouter()
 transcript_service = TranscriptService()
 
+def _to_transcript_response(video_id: str, result: dict) -> TranscriptWithTimestampsResponse:
+    if not result["success"]:
+        return TranscriptWithTimestampsResponse(
+            success=False,
+            video_id=video_id,
+            segments=[],
+            metadata={"error": result["error"]}
+        )
+    
+    return TranscriptWithTimestampsResponse(
+        success=True,
+        video_id=video_id,
+        segments=result["segments"],
+        metadata=result["metadata"]
+    )
+
 @router.get("/transcript-supadata/{video_id}", response_model=TranscriptWithTimestampsResponse)
 async def get_transcript_supadata(
     video_id: str,
@@ -14,44 +30,8 @@ async def get_transcript_supadata(
     save_to_db: bool = Query(True)
 ):
     try:
-        result = transcript_service.extract_transcript(video_id, language)
-        
-        if not result["success"]:
-
-            return TranscriptWithTimestampsResponse(
-                success=False,
-                video_id=video_id,
-                segments=[],
-                metadata={"error": result["error"]}
-            )
-        
-        response_data = TranscriptWithTimestampsResponse(
-            success=True,
-            video_id=video_id,
-            segments=result["segments"],
-            metadata=result["metadata"]
-        )
-        
-
-        
-        if save_to_db and result["segments"]:
-            try:
-                db_result = await transcript_service.save_transcript_to_db(
-                    video_id=video_id,
-                    segments=result["segments"]
-                )
-                
-                response_data.metadata["db_saved"] = db_result["success"]
-                if db_result["success"]:
-                    response_data.metadata["segments_saved"] = db_result["segments_saved"]
-                else:
-                    response_data.metadata["db_error"] = db_result["error"]
-                    
-            except Exception as e:
-                response_data.metadata["db_saved"] = False
-                response_data.metadata["db_error"] = f"Database save failed: {str(e)}"
-        
-        return response_data
+        result = await transcript_service.get_transcript(video_id, language, save_to_db=save_to_db)
+        return _to_transcript_response(video_id, result)
         
     except Exception as e:
         return TranscriptWithTimestampsResponse(
@@ -61,6 +41,19 @@ async def get_transcript_supadata(
             metadata={"error": f"Unexpected error: {str(e)}"}
         )
 
+@router.post("/bulk", response_model=BulkTranscriptResponse)
+async def get_transcripts_bulk(request: BulkTranscriptRequest):
+    """Fetch transcripts for several videos concurrently, preserving request order."""
+    results = await transcript_service.get_transcripts_bulk(
+        request.video_ids,
+        request.language,
+        save_to_db=request.save_to_db
+    )
+    return BulkTranscriptResponse(results=[
+        _to_transcript_response(video_id, result)
+        for video_id, result in zip(request.video_ids, results)
+    ])
+
 @router.get("/search/{video_id}")
 async def get_transcript_from_db(video_id: str):
     """Get transcript segments from database by video ID."""
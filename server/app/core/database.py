@@ -25,6 +25,8 @@ async def connect_to_mongo():
     
     from ..models.transcript_db import TranscriptSegmentDB
     
+    await migrate_segment_index(database.database[TranscriptSegmentDB.Settings.name])
+    
     await init_beanie(
         database=database.database,
         document_models=[TranscriptSegmentDB]
@@ -32,6 +34,40 @@ async def connect_to_mongo():
     
     print("MongoDB connection and Beanie initialization complete")
 
+async def migrate_segment_index(collection):
+    """Replace the legacy non-unique (video_id, sequence) index before Beanie builds the unique one
+    
+    Older releases saved transcripts with delete-then-insert, so racing saves could leave
+    duplicate rows for a segment position. Those are removed first, keeping the newest row,
+    since the unique index cannot be built while they exist.
+    """
+    from ..models.transcript_db import LEGACY_SEGMENT_INDEX_NAME
+    
+    indexes = await collection.index_information()
+    legacy_index = indexes.get(LEGACY_SEGMENT_INDEX_NAME)
+    if legacy_index is None:
+        return
+    
+    if not legacy_index.get("unique"):
+        duplicate_ids = []
+        cursor = collection.aggregate([
+            {"$sort": {"created_at": -1}},
+            {"$group": {
+                "_id": {"video_id": "$video_id", "sequence": "$sequence"},
+                "ids": {"$push": "$_id"},
+                "count": {"$sum": 1}
+            }},
+            {"$match": {"count": {"$gt": 1}}}
+        ], allowDiskUse=True)
+        async for group in cursor:
+            duplicate_ids.extend(group["ids"][1:])
+        for start in range(0, len(duplicate_ids), 1000):
+            await collection.delete_many({"_id": {"$in": duplicate_ids[start:start + 1000]}})
+        print(f"Removed {len(duplicate_ids)} duplicate transcript segments")
+    
+    await collection.drop_index(LEGACY_SEGMENT_INDEX_NAME)
+    print(f"Dropped legacy index {LEGACY_SEGMENT_INDEX_NAME}")
+
 async def close_mongo_connection():
     """Close database connection"""
     if database.client:
@@ -0,0 +1,46 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import Counter, Histogram, make_asgi_app
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    Counter = Histogram = make_asgi_app = None
+    PROMETHEUS_AVAILABLE = False
+    logger.info("prometheus_client not available; metrics will not be exported")
+
+if PROMETHEUS_AVAILABLE:
+    TRANSCRIPT_CACHE_HITS = Counter(
+        "transcript_cache_hits_total",
+        "Transcript requests answered without running an extractor",
+        ["source"]
+    )
+    TRANSCRIPT_CACHE_MISSES = Counter(
+        "transcript_cache_misses_total",
+        "Transcript requests that had to run the extractors"
+    )
+    TRANSCRIPT_EXTRACTION_FAILURES = Counter(
+        "transcript_extraction_failures_total",
+        "Failed transcript extraction attempts",
+        ["method"]
+    )
+    TRANSCRIPT_EXTRACTION_SECONDS = Histogram(
+        "transcript_extraction_seconds",
+        "Wall time spent in a transcript extraction method",
+        ["method"]
+    )
+
+def record_transcript_cache_hit(source: str):
+    if PROMETHEUS_AVAILABLE:
+        TRANSCRIPT_CACHE_HITS.labels(source=source).inc()
+
+def record_transcript_cache_miss():
+    if PROMETHEUS_AVAILABLE:
+        TRANSCRIPT_CACHE_MISSES.inc()
+
+def record_transcript_extraction(method: str, seconds: float, success: bool):
+    if PROMETHEUS_AVAILABLE:
+        TRANSCRIPT_EXTRACTION_SECONDS.labels(method=method).observe(seconds)
+        if not success:
+            TRANSCRIPT_EXTRACTION_FAILURES.labels(method=method).inc()
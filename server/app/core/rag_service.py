@@ -1,11 +1,15 @@
 import os
+import asyncio
+import json
 import logging
 import re
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import numpy as np
 from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
+from .cache import TTLCache
 
 try:
     import chromadb
@@ -18,21 +22,129 @@ except ImportError as e:
     chromadb = None
     Settings = None
     logger = logging.getLogger(__name__)
-    logger.warning(f"ChromaDB not available: {str(e)}. RAG service will use in-memory storage.")
+    logger.warning("ChromaDB not available: %s. RAG service will use in-memory storage.", e)
 
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    simsimd = None
+    SIMSIMD_AVAILABLE = False
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    faiss = None
+    FAISS_AVAILABLE = False
+
 load_dotenv()
 
+HNSW_COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 100
+}
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openvino")
+OPENVINO_INT8_MODEL_FILE = "openvino/openvino_model_qint8_quantized.xml"
+
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "faiss")
+VECTOR_STORE_PRECISION = os.getenv("VECTOR_STORE_PRECISION", "float32")
+FAISS_PERSIST_DIRECTORY = os.getenv("FAISS_PERSIST_DIRECTORY", "./faiss_db")
+FAISS_HNSW_THRESHOLD = 100_000
+# Rows widened to float32 per step of the int8/float16 scan without simsimd; small enough to stay in cache
+QUANTIZED_SCAN_BLOCK_ROWS = 4096
+MEMORY_STORE_PERSIST_DIRECTORY = os.getenv("MEMORY_STORE_PERSIST_DIRECTORY", "./memstore")
+
+CHROMA_UPSERT_BATCH_SIZE = 256
+
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = 3600
+SEARCH_CACHE_MAX_ENTRIES = 256
+SEARCH_CACHE_TTL_SECONDS = 300
+COLLECTION_LIST_CACHE_TTL_SECONDS = 5
+# Chunks scoring below this cosine similarity are dropped at query time; 0 keeps every top-k hit
+RAG_MIN_RELEVANCE = float(os.getenv("RAG_MIN_RELEVANCE", "0"))
+
+RAG_SYSTEM_PROMPT = """You are a helpful assistant that analyzes podcast transcripts. Provide clear, concise answers.
+
+FORMATTING RULES:
+- Start with the direct answer (1-2 sentences)
+- Use line breaks and clear spacing for readability
+- Be confident and definitive based on evidence
+- Use timestamps strategically when they add value
+
+STRUCTURE:
+1. Direct answer first
+2. Blank line
+3. "Key Points:" (followed by list items with dashes)
+4. Blank line  
+5. "Evidence:" (if timestamps add value)
+
+KEEP IT CONCISE: 150-300 words maximum."""
+
+RAG_SYSTEM_MESSAGE = {"role": "system", "content": RAG_SYSTEM_PROMPT}
+
+RAG_USER_PROMPT_TEMPLATE = """Question: {query}
+
+Transcript Segments:
+{context}
+
+Provide a clear, concise answer following this format:
+
+Direct answer (1-2 sentences)
+
+Key Points:
+- First key point
+- Second key point
+- Third key point
+
+Evidence:
+- [timestamp] relevant detail (only if timestamps add value)
+
+Use simple text with line breaks. No markdown formatting."""
+
+SENTENCE_BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+')
+WORD_RE = re.compile(r"[a-z0-9']+")
+
+# A chunk containing every query keyword ranks as if its similarity were this much higher
+KEYWORD_WEIGHT = 1.5
+QUERY_STOPWORDS = frozenset({
+    "the", "and", "for", "are", "but", "not", "you", "all", "any", "can", "had", "her", "was", "one",
+    "our", "out", "has", "him", "his", "how", "its", "who", "did", "does", "what", "when", "where",
+    "which", "why", "with", "about", "from", "into", "that", "this", "these", "those", "they", "them",
+    "their", "there", "then", "than", "have", "been", "being", "were", "will", "would", "could",
+    "should", "say", "said", "says", "tell", "talk", "talks", "discuss", "discussed", "video",
+    "podcast", "episode", "speaker", "mention", "mentioned", "explain", "explains", "some", "more"
+})
+
+@lru_cache(maxsize=None)
+def load_embedding_model(model_name: str) -> SentenceTransformer:
+    if EMBEDDING_BACKEND == "openvino":
+        try:
+            return SentenceTransformer(
+                model_name,
+                backend="openvino",
+                model_kwargs={"file_name": OPENVINO_INT8_MODEL_FILE}
+            )
+        except Exception as e:
+            logger.warning("OpenVINO int8 backend unavailable for %s: %s. Falling back to FP32.", model_name, e)
+    return SentenceTransformer(model_name)
+
 def simple_text_splitter(text: str, chunk_size: int = 800, overlap: int = 100) -> List[str]:
+    text = text.strip()
     if len(text) <= chunk_size:
-        return [text]
+        return [text] if text else []
     
-    sentences = re.split(r'(?<=[.!?])\s+', text)
+    sentences = SENTENCE_BOUNDARY_RE.split(text)
     if len(sentences) <= 1:
         words = text.split()
         chunks = []
@@ -52,7 +164,7 @@ def simple_text_splitter(text: str, chunk_size: int = 800, overlap: int = 100) -
         
         if current_chunk:
             chunks.append(' '.join(current_chunk))
-        return [c for c in chunks if c.strip()]
+        return chunks
     
     chunks = []
     current_chunk = []
@@ -72,7 +184,14 @@ def simple_text_splitter(text: str, chunk_size: int = 800, overlap: int = 100) -
     if current_chunk:
         chunks.append(' '.join(current_chunk))
     
-    return [c.strip() for c in chunks if c.strip()]
+    return [c for c in chunks if c]
+
+def format_timestamp_label(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{secs:02d}"
+
+def format_timestamp(seconds: float) -> str:
+    return f"[{format_timestamp_label(seconds)}]"
 
 def enhance_query(query: str) -> List[str]:
     queries = [query]
@@ -93,101 +212,484 @@ def enhance_query(query: str) -> List[str]:
     
     return list(dict.fromkeys(queries))[:4]
 
+@lru_cache(maxsize=1024)
+def extract_keywords(query: str) -> frozenset:
+    return frozenset(
+        word for word in WORD_RE.findall(query.lower())
+        if len(word) > 2 and word not in QUERY_STOPWORDS
+    )
+
+def keyword_weight(keywords: frozenset, text: str) -> float:
+    if not keywords:
+        return 1.0
+    matched = len(keywords.intersection(WORD_RE.findall(text.lower())))
+    return 1 + (KEYWORD_WEIGHT - 1) * matched / len(keywords)
+
+VECTOR_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+def quantize_int8(vectors: np.ndarray) -> np.ndarray:
+    max_abs = np.abs(vectors).max(axis=-1, keepdims=True)
+    scales = np.where(max_abs > 0, 127.0 / np.clip(max_abs, 1e-12, None), 0.0)
+    return np.round(vectors * scales).astype(np.int8)
+
+def append_rows(buffer: Optional[np.ndarray], size: int, rows: np.ndarray) -> np.ndarray:
+    required = size + len(rows)
+    if buffer is None or required > len(buffer):
+        capacity = max(required, 2 * len(buffer) if buffer is not None else 0)
+        grown = np.empty((capacity,) + rows.shape[1:], dtype=rows.dtype)
+        if buffer is not None:
+            grown[:size] = buffer[:size]
+        buffer = grown
+    buffer[size:required] = rows
+    return buffer
+
+def save_array(path: str, array: np.ndarray):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+def metadatas_to_columns(metadatas: List[Dict]) -> Dict[str, np.ndarray]:
+    if not metadatas:
+        return {}
+    return {key: np.asarray([m.get(key) for m in metadatas]) for key in metadatas[0]}
+
 class InMemoryVectorStore:
-    def __init__(self):
+    def __init__(self, precision: str = "float32", persist_directory: Optional[str] = None,
+                 model_id: Optional[str] = None, dimension: Optional[int] = None):
+        if precision not in VECTOR_DTYPES:
+            raise ValueError(f"Unsupported vector precision: {precision}")
+        self.precision = precision
+        self.dtype = np.dtype(VECTOR_DTYPES[precision])
+        # Recorded with every persisted collection; ones embedded by another model are dropped on load
+        self.model_id = model_id
+        self.dimension = dimension
         self.collections = {}
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        
+        self.persist_directory = persist_directory
+        if persist_directory:
+            os.makedirs(persist_directory, exist_ok=True)
+    
+    def _new_collection(self) -> Dict[str, Any]:
+        return {
+            'documents': [],
+            'embeddings': None,
+            'norms': None,
+            'size': 0,
+            'metadata_columns': {},
+            'ids': []
+        }
+    
+    def _metadata_path(self, name: str) -> str:
+        return os.path.join(self.persist_directory, f"{name}.json")
+    
+    def _embeddings_path(self, name: str) -> str:
+        return os.path.join(self.persist_directory, f"{name}.npy")
+    
+    def _norms_path(self, name: str) -> str:
+        return os.path.join(self.persist_directory, f"{name}.norms.npy")
+    
+    def _persisted_paths(self, name: str) -> List[str]:
+        return [self._embeddings_path(name), self._norms_path(name), self._metadata_path(name)]
+    
+    def _is_persisted(self, name: str) -> bool:
+        return os.path.exists(self._metadata_path(name))
+    
+    def _persisted_names(self) -> List[str]:
+        return [
+            filename[:-len(".json")]
+            for filename in os.listdir(self.persist_directory)
+            if filename.endswith(".json")
+        ]
+    
+    def _read_metadata(self, name: str) -> Dict[str, Any]:
+        with open(self._metadata_path(name), 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        if 'metadata_columns' in stored:
+            metadata_columns = {key: np.asarray(values) for key, values in stored['metadata_columns'].items()}
+        else:
+            metadata_columns = metadatas_to_columns(stored.get('metadatas', []))
+        return {
+            'documents': stored['documents'],
+            'metadata_columns': metadata_columns,
+            'ids': stored['ids'],
+            'last_updated': stored.get('last_updated'),
+            'model_id': stored.get('model_id')
+        }
+    
+    def _write_metadata(self, name: str):
+        collection = self.collections[name]
+        last_updated = collection.get('last_updated')
+        with open(self._metadata_path(name), 'w', encoding='utf-8') as f:
+            json.dump({
+                'documents': collection['documents'],
+                'metadata_columns': {key: column.tolist() for key, column in collection['metadata_columns'].items()},
+                'ids': collection['ids'],
+                'last_updated': last_updated.isoformat() if isinstance(last_updated, datetime) else last_updated,
+                'model_id': self.model_id,
+                'dimension': self._dimension(name)
+            }, f)
+    
+    def _dimension(self, name: str) -> Optional[int]:
+        embeddings = self.collections[name]['embeddings']
+        return int(embeddings.shape[1]) if embeddings is not None else None
+    
+    def _drop_if_other_model(self, name: str, collection: Dict[str, Any], dimension: int) -> bool:
+        """Delete a persisted collection whose vectors came from another embedding model"""
+        stored_model_id = collection.get('model_id')
+        other_model = bool(self.model_id and stored_model_id and stored_model_id != self.model_id)
+        other_dimension = bool(self.dimension and dimension != self.dimension)
+        if not (other_model or other_dimension):
+            return False
+        logger.warning("Dropping persisted collection %s: embedded with %s (%d-d), current model is %s (%s-d)",
+                       name, stored_model_id or "unknown model", dimension, self.model_id, self.dimension)
+        self.delete_collection(name)
+        return True
+    
+    def _load(self, name: str):
+        collection = self._read_metadata(name)
+        embeddings = np.load(self._embeddings_path(name), mmap_mode='r')
+        if self._drop_if_other_model(name, collection, embeddings.shape[1]):
+            return
+        norms_path = self._norms_path(name)
+        norms = np.load(norms_path, mmap_mode='r') if os.path.exists(norms_path) else None
+        converted = embeddings.dtype != self.dtype
+        if converted:
+            # Written under another VECTOR_STORE_PRECISION; convert once and rewrite the files below
+            logger.info("Converting persisted collection %s from %s to %s", name, embeddings.dtype, self.precision)
+            vectors = np.asarray(embeddings, dtype=np.float32)
+            if embeddings.dtype == np.int8:
+                vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+            embeddings, norms = self._store_rows(vectors)
+        collection.update({
+            'embeddings': embeddings,
+            'norms': norms,
+            'size': len(embeddings)
+        })
+        self.collections[name] = collection
+        if converted:
+            self._save(name)
+    
+    def _save(self, name: str):
+        collection = self.collections[name]
+        size = collection['size']
+        save_array(self._embeddings_path(name), collection['embeddings'][:size])
+        if collection['norms'] is not None:
+            save_array(self._norms_path(name), collection['norms'][:size])
+        elif os.path.exists(self._norms_path(name)):
+            os.remove(self._norms_path(name))
+        self._write_metadata(name)
+    
+    def _load_if_persisted(self, name: str):
+        if name not in self.collections and self.persist_directory and self._is_persisted(name):
+            self._load(name)
+    
     def get_or_create_collection(self, name: str):
+        self._load_if_persisted(name)
         if name not in self.collections:
-            self.collections[name] = {
-                'documents': [],
-                'embeddings': [],
-                'metadatas': [],
-                'ids': []
-            }
+            self.collections[name] = self._new_collection()
         return self.collections[name]
     
+    def _store_rows(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Cast L2-normalized float32 rows to the store precision, with row norms for int8"""
+        if self.precision == "int8":
+            rows = quantize_int8(vectors)
+            return rows, np.linalg.norm(rows.astype(np.float32), axis=1)
+        return vectors.astype(self.dtype, copy=False), None
+    
+    def _append_metadatas(self, collection: Dict[str, Any], metadatas: List[Dict]):
+        new_columns = metadatas_to_columns(metadatas)
+        columns = collection['metadata_columns']
+        if not columns:
+            collection['metadata_columns'] = new_columns
+            return
+        for key, values in new_columns.items():
+            columns[key] = np.concatenate([columns[key], values]) if key in columns else values
+    
+    def _metadatas_at(self, collection: Dict[str, Any], indices) -> List[Dict[str, Any]]:
+        columns = collection['metadata_columns']
+        return [{key: column[i].item() for key, column in columns.items()} for i in indices]
+    
     def add_to_collection(self, collection_name: str, documents: List[str], 
-                         embeddings: List[List[float]], metadatas: List[Dict], ids: List[str]):
+                         embeddings, metadatas: List[Dict], ids: List[str],
+                         normalized: bool = False):
         collection = self.get_or_create_collection(collection_name)
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if not normalized:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.clip(norms, 1e-12, None)
+        
+        size = collection['size']
+        vectors, row_norms = self._store_rows(vectors)
+        if row_norms is not None:
+            collection['norms'] = append_rows(collection['norms'], size, row_norms)
+        
+        collection['embeddings'] = append_rows(collection['embeddings'], size, vectors)
+        collection['size'] = size + len(vectors)
         collection['documents'].extend(documents)
-        collection['embeddings'].extend(embeddings)
-        collection['metadatas'].extend(metadatas)
+        self._append_metadatas(collection, metadatas)
         collection['ids'].extend(ids)
         collection['last_updated'] = datetime.now()
+        if self.persist_directory:
+            self._save(collection_name)
     
     def query_collection(self, collection_name: str, query_embedding: List[float], 
-                        n_results: int = 5) -> Dict[str, Any]:
-        if collection_name not in self.collections:
+                        n_results: int = 5, max_distance: Optional[float] = None,
+                        normalized: bool = False) -> Dict[str, Any]:
+        self._load_if_persisted(collection_name)
+        collection = self.collections.get(collection_name)
+        if collection is None or not collection['size']:
             return {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
+        size = collection['size']
+        matrix = collection['embeddings'][:size]
         
-        collection = self.collections[collection_name]
-        if not collection['embeddings']:
-            return {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
-        
-        query_vector = np.array(query_embedding)
-        similarities = []
-        
-        for embedding in collection['embeddings']:
-            doc_vector = np.array(embedding)
-            dot_product = np.dot(query_vector, doc_vector)
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        if not normalized:
             query_norm = np.linalg.norm(query_vector)
-            doc_norm = np.linalg.norm(doc_vector)
-            
-            if query_norm == 0 or doc_norm == 0:
-                similarity = 0.0
+            if query_norm > 0:
+                query_vector = query_vector / query_norm
+        
+        if SIMSIMD_AVAILABLE:
+            # SimSIMD has native kernels for every stored dtype, so the query is cast to match the rows
+            if self.precision == "int8":
+                query_vector = quantize_int8(query_vector)
             else:
-                similarity = dot_product / (query_norm * doc_norm)
-            
-            distance = 1 - similarity
-            similarities.append(distance)
+                query_vector = query_vector.astype(self.dtype, copy=False)
+            distances = np.asarray(
+                simsimd.cdist(query_vector[np.newaxis, :], matrix, metric="cosine"),
+                dtype=np.float32
+            ).ravel()
+        elif self.precision == "float32":
+            distances = 1 - matrix @ query_vector
+        else:
+            # NumPy has no fast int8/float16 GEMV, so upcast one block at a time instead of the whole matrix
+            similarities = np.empty(size, dtype=np.float32)
+            for start in range(0, size, QUANTIZED_SCAN_BLOCK_ROWS):
+                end = min(start + QUANTIZED_SCAN_BLOCK_ROWS, size)
+                np.dot(matrix[start:end].astype(np.float32), query_vector, out=similarities[start:end])
+            if self.precision == "int8":
+                similarities /= np.clip(collection['norms'][:size], 1e-12, None)
+            distances = 1 - similarities
         
-        top_indices = np.argsort(similarities)[:n_results]
+        k = min(n_results, len(distances))
+        top_indices = np.argpartition(distances, k - 1)[:k]
+        top_indices = top_indices[np.argsort(distances[top_indices])]
+        if max_distance is not None:
+            top_indices = top_indices[distances[top_indices] <= max_distance]
         
         return {
             'documents': [[collection['documents'][i] for i in top_indices]],
-            'metadatas': [[collection['metadatas'][i] for i in top_indices]],
-            'distances': [[similarities[i] for i in top_indices]]
+            'metadatas': [self._metadatas_at(collection, top_indices)],
+            'distances': [[float(distances[i]) for i in top_indices]]
         }
     
     def delete_collection(self, name: str):
         if name in self.collections:
             del self.collections[name]
+        if self.persist_directory:
+            for path in self._persisted_paths(name):
+                if os.path.exists(path):
+                    os.remove(path)
+    
+    def _forget(self, name: str):
+        self.collections.pop(name, None)
     
     def list_collections(self) -> List[Dict[str, Any]]:
+        if self.persist_directory:
+            persisted = set(self._persisted_names())
+            # Another worker may have deleted these files since they were loaded here
+            for name in [name for name in self.collections if name not in persisted]:
+                self._forget(name)
+            for name in persisted:
+                if name not in self.collections:
+                    self._load(name)
         return [{
             "name": name.replace("transcript_", ""),
             "count": len(collection['documents']),
             "last_updated": collection.get('last_updated')
-        } for name, collection in self.collections.items()]
+        } for name, collection in list(self.collections.items())]
+
+class FaissVectorStore(InMemoryVectorStore):
+    def __init__(self, persist_directory: str = FAISS_PERSIST_DIRECTORY,
+                 model_id: Optional[str] = None, dimension: Optional[int] = None):
+        super().__init__(persist_directory=persist_directory, model_id=model_id, dimension=dimension)
+        self.indexes = {}
+    
+    def _new_collection(self) -> Dict[str, Any]:
+        return {
+            'documents': [],
+            'metadata_columns': {},
+            'ids': []
+        }
+    
+    def _index_path(self, name: str) -> str:
+        return os.path.join(self.persist_directory, f"{name}.index")
+    
+    def _persisted_paths(self, name: str) -> List[str]:
+        return [self._index_path(name), self._metadata_path(name)]
+    
+    def _is_persisted(self, name: str) -> bool:
+        return os.path.exists(self._index_path(name))
+    
+    def _persisted_names(self) -> List[str]:
+        return [
+            filename[:-len(".index")]
+            for filename in os.listdir(self.persist_directory)
+            if filename.endswith(".index")
+        ]
+    
+    def _dimension(self, name: str) -> Optional[int]:
+        index = self.indexes.get(name)
+        return index.d if index is not None else None
+    
+    def _load(self, name: str):
+        collection = self._read_metadata(name)
+        index = faiss.read_index(self._index_path(name))
+        if self._drop_if_other_model(name, collection, index.d):
+            return
+        self.indexes[name] = index
+        self.collections[name] = collection
+    
+    def _save(self, name: str):
+        faiss.write_index(self.indexes[name], self._index_path(name))
+        self._write_metadata(name)
+    
+    def add_to_collection(self, collection_name: str, documents: List[str], 
+                         embeddings, metadatas: List[Dict], ids: List[str],
+                         normalized: bool = False):
+        collection = self.get_or_create_collection(collection_name)
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if not normalized:
+            # normalize_L2 works in place, and ascontiguousarray hands back the caller's array when it can
+            vectors = vectors.copy()
+            faiss.normalize_L2(vectors)
+        
+        index = self.indexes.get(collection_name)
+        if index is None:
+            index = faiss.IndexFlatIP(vectors.shape[1])
+        index.add(vectors)
+        if index.ntotal > FAISS_HNSW_THRESHOLD and isinstance(index, faiss.IndexFlatIP):
+            index = self._build_hnsw_index(index)
+        self.indexes[collection_name] = index
+        
+        collection['documents'].extend(documents)
+        self._append_metadatas(collection, metadatas)
+        collection['ids'].extend(ids)
+        collection['last_updated'] = datetime.now()
+        self._save(collection_name)
+    
+    def _build_hnsw_index(self, flat_index):
+        hnsw_index = faiss.IndexHNSWFlat(flat_index.d, 32, faiss.METRIC_INNER_PRODUCT)
+        hnsw_index.hnsw.efConstruction = 200
+        hnsw_index.hnsw.efSearch = 64
+        hnsw_index.add(flat_index.reconstruct_n(0, flat_index.ntotal))
+        return hnsw_index
+    
+    def query_collection(self, collection_name: str, query_embedding: List[float], 
+                        n_results: int = 5, max_distance: Optional[float] = None,
+                        normalized: bool = False) -> Dict[str, Any]:
+        self._load_if_persisted(collection_name)
+        index = self.indexes.get(collection_name)
+        if collection_name not in self.collections or index is None or index.ntotal == 0:
+            return {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
+        
+        collection = self.collections[collection_name]
+        query_vector = np.array(query_embedding, dtype=np.float32).reshape(1, -1)
+        if not normalized:
+            faiss.normalize_L2(query_vector)
+        
+        similarities, indices = index.search(query_vector, min(n_results, index.ntotal))
+        min_score = None if max_distance is None else 1 - max_distance
+        hits = [
+            (int(i), float(score)) for i, score in zip(indices[0], similarities[0])
+            if i >= 0 and (min_score is None or score >= min_score)
+        ]
+        
+        return {
+            'documents': [[collection['documents'][i] for i, _ in hits]],
+            'metadatas': [self._metadatas_at(collection, [i for i, _ in hits])],
+            'distances': [[1 - score for _, score in hits]]
+        }
+    
+    def _forget(self, name: str):
+        super()._forget(name)
+        self.indexes.pop(name, None)
+    
+    def delete_collection(self, name: str):
+        super().delete_collection(name)
+        self.indexes.pop(name, None)
 
 class RAGService:
     def __init__(self):
         try:
-            self.embedding_model = SentenceTransformer('all-mpnet-base-v2')
+            self.embedding_model = load_embedding_model('all-mpnet-base-v2')
+            self._model_id = 'all-mpnet-base-v2'
         except Exception:
-            self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+            self.embedding_model = load_embedding_model('all-MiniLM-L6-v2')
+            self._model_id = 'all-MiniLM-L6-v2'
+        
+        self._query_embedding_cache = TTLCache(QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_TTL_SECONDS)
+        self._search_cache = TTLCache(SEARCH_CACHE_MAX_ENTRIES, SEARCH_CACHE_TTL_SECONDS)
+        # Holds (collections, names) read from the store; rebuilt once the TTL lapses so
+        # collections processed or deleted by other workers show up
+        self._collection_list_cache = TTLCache(1, COLLECTION_LIST_CACHE_TTL_SECONDS)
+        # Bumped by process and delete so a listing that raced them is never cached
+        self._collection_generation = 0
         
-        if CHROMADB_AVAILABLE:
+        self.use_chromadb = False
+        self.vector_store = None
+        embedding_dimension = self.embedding_model.get_sentence_embedding_dimension()
+        
+        if VECTOR_STORE_BACKEND == "faiss" and FAISS_AVAILABLE:
+            self.vector_store = FaissVectorStore(model_id=self._model_id, dimension=embedding_dimension)
+            self.vector_store_type = "FAISS"
+        elif VECTOR_STORE_BACKEND != "memory" and CHROMADB_AVAILABLE:
             try:
                 self.chroma_client = chromadb.Client(Settings(
                     persist_directory="./chroma_db",
                     anonymized_telemetry=False
                 ))
                 self.use_chromadb = True
+                self.vector_store_type = "ChromaDB"
             except Exception:
-                self.vector_store = InMemoryVectorStore()
-                self.use_chromadb = False
-        else:
-            self.vector_store = InMemoryVectorStore()
-            self.use_chromadb = False
+                pass
+        
+        if not self.use_chromadb and self.vector_store is None:
+            self.vector_store = InMemoryVectorStore(
+                precision=VECTOR_STORE_PRECISION,
+                persist_directory=MEMORY_STORE_PERSIST_DIRECTORY,
+                model_id=self._model_id,
+                dimension=embedding_dimension
+            )
+            self.vector_store_type = "In-Memory"
         
         openai_api_key = os.getenv("OPENAI_API_KEY")
         if openai_api_key and OPENAI_AVAILABLE:
             self.openai_client = OpenAI(api_key=openai_api_key)
+            self.async_openai_client = AsyncOpenAI(api_key=openai_api_key)
         else:
             self.openai_client = None
+            self.async_openai_client = None
+        
+        self.chat_model = os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini")
+        self.fallback_chat_model = os.getenv("OPENAI_FALLBACK_CHAT_MODEL", "gpt-3.5-turbo")
+    
+    def _embed_queries(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed query variants, encoding all uncached ones in a single forward pass"""
+        embeddings = [self._query_embedding_cache.get(text) for text in texts]
+        missing = [text for text, embedding in zip(texts, embeddings) if embedding is None]
+        if missing:
+            encoded = self.embedding_model.encode(
+                missing, batch_size=len(missing), normalize_embeddings=True, convert_to_numpy=True
+            ).astype(np.float32)
+            encoded.flags.writeable = False
+            fresh = dict(zip(missing, encoded))
+            for text, embedding in fresh.items():
+                self._query_embedding_cache.set(text, embedding)
+            embeddings = [fresh[text] if embedding is None else embedding for text, embedding in zip(texts, embeddings)]
+        return embeddings
+    
+    def _invalidate_search_cache(self, video_id: str):
+        self._search_cache.discard_where(lambda key: key[0] == video_id)
         
     def get_or_create_collection(self, video_id: str):
         collection_name = f"transcript_{video_id}"
@@ -198,63 +700,97 @@ class RAGService:
             except:
                 collection = self.chroma_client.create_collection(
                     name=collection_name,
-                    metadata={"video_id": video_id, "created_at": datetime.now().isoformat()}
+                    metadata={
+                        "video_id": video_id,
+                        "created_at": datetime.now().isoformat(),
+                        **HNSW_COLLECTION_METADATA
+                    }
                 )
             return collection
         else:
             return self.vector_store.get_or_create_collection(collection_name)
     
     def process_and_store_transcript(self, video_id: str, segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+        texts = [segment.get('text', '') for segment in segments]
+        timestamps = np.fromiter(
+            (segment.get('timestamp') or 0 for segment in segments), dtype=np.float64, count=len(segments)
+        )
+        return self.process_and_store_transcript_columns(video_id, texts, timestamps)
+    
+    def process_and_store_transcript_columns(self, video_id: str, texts: List[str],
+                                             timestamps: np.ndarray) -> Dict[str, Any]:
+        """Chunk, embed and store a transcript given as parallel text and timestamp columns"""
         try:
             collection_name = f"transcript_{video_id}"
-            
-            if self.use_chromadb:
-                collection = self.get_or_create_collection(video_id)
-                collection.modify(metadata={"last_updated": datetime.now().isoformat()})
+            self._invalidate_search_cache(video_id)
 
+            segment_indices = []
+            segment_texts = []
+            for i, raw_text in enumerate(texts):
+                text = ' '.join(raw_text.split())
+                if text:
+                    segment_indices.append(i)
+                    segment_texts.append(text)
+            
+            full_text = ' '.join(segment_texts)
+            segment_starts = np.cumsum([0] + [len(text) + 1 for text in segment_texts[:-1]])
+            
             chunks = []
             metadatas = []
             ids = []
+            search_from = 0
             
-            for i, segment in enumerate(segments):
-                text = segment.get('text', '')
-                timestamp = segment.get('timestamp', 0)
+            for j, chunk in enumerate(simple_text_splitter(full_text, 800, 100)):
+                start = full_text.find(chunk, search_from)
+                if start == -1:
+                    start = search_from
+                else:
+                    search_from = start + 1
                 
-                segment_chunks = simple_text_splitter(text, 800, 100)
+                if len(chunk) < 20:
+                    continue
                 
-                for j, chunk in enumerate(segment_chunks):
-                    if len(chunk.strip()) < 20:
-                        continue
-                        
-                    chunks.append(chunk.strip())
-                    metadatas.append({
-                        "video_id": video_id,
-                        "segment_index": i,
-                        "chunk_index": j,
-                        "timestamp": timestamp,
-                        "original_text": text,
-                        "chunk_length": len(chunk)
-                    })
-                    ids.append(f"{video_id}_{i}_{j}")
+                i = segment_indices[int(np.searchsorted(segment_starts, start, side='right')) - 1]
+                timestamp = float(timestamps[i])
+                chunks.append(chunk)
+                metadatas.append({
+                    "video_id": video_id,
+                    "segment_index": i,
+                    "chunk_index": j,
+                    "timestamp": timestamp,
+                    "ts_label": format_timestamp_label(timestamp),
+                    "chunk_length": len(chunk)
+                })
+                ids.append(f"{video_id}_{i}_{j}")
             
             if not chunks:
                 return {"success": False, "error": "No valid chunks to process"}
             
-            embeddings = self.embedding_model.encode(chunks).tolist()
+            embeddings = self.embedding_model.encode(
+                chunks,
+                batch_size=64,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            ).astype(np.float32)
             
             if self.use_chromadb:
                 collection = self.get_or_create_collection(video_id)
-                collection.add(
-                    embeddings=embeddings,
-                    documents=chunks,
-                    metadatas=metadatas,
-                    ids=ids
-                )
+                for start in range(0, len(ids), CHROMA_UPSERT_BATCH_SIZE):
+                    end = start + CHROMA_UPSERT_BATCH_SIZE
+                    collection.upsert(
+                        embeddings=embeddings[start:end].tolist(),
+                        documents=chunks[start:end],
+                        metadatas=metadatas[start:end],
+                        ids=ids[start:end]
+                    )
             else:
                 self.vector_store.add_to_collection(
-                    collection_name, chunks, embeddings, metadatas, ids
+                    collection_name, chunks, embeddings, metadatas, ids, normalized=True
                 )
             
+            self._invalidate_collection_list()
+            
             return {
                 "success": True,
                 "chunks_stored": len(chunks),
@@ -262,28 +798,36 @@ class RAGService:
             }
             
         except Exception as e:
-            logger.error(f"Error processing transcript for {video_id}: {str(e)}")
+            logger.error("Error processing transcript for %s: %s", video_id, e)
             return {"success": False, "error": str(e)}
     
     def search_transcript(self, video_id: str, query: str, top_k: int = 100) -> Dict[str, Any]:
         try:
+            cache_key = (video_id, query, top_k)
+            cached = self._search_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
             collection_name = f"transcript_{video_id}"
             enhanced_queries = enhance_query(query)
+            max_distance = 1 - RAG_MIN_RELEVANCE if RAG_MIN_RELEVANCE > 0 else None
             all_results = []
             
-            for enhanced_query in enhanced_queries:
-                query_embedding = self.embedding_model.encode([enhanced_query]).tolist()[0]
+            query_embeddings = self._embed_queries(enhanced_queries)
+            
+            for enhanced_query, query_embedding in zip(enhanced_queries, query_embeddings):
                 
                 if self.use_chromadb:
                     collection = self.get_or_create_collection(video_id)
                     results = collection.query(
-                        query_embeddings=[query_embedding],
+                        query_embeddings=[query_embedding.tolist()],
                         n_results=min(top_k * 2, 500),
                         include=["documents", "metadatas", "distances"]
                     )
                 else:
                     results = self.vector_store.query_collection(
-                        collection_name, query_embedding, min(top_k * 2, 500)
+                        collection_name, query_embedding, min(top_k * 2, 500),
+                        max_distance=max_distance, normalized=True
                     )
                 
                 if results['documents'] and results['documents'][0]:
@@ -292,7 +836,9 @@ class RAGService:
                         results['metadatas'][0],
                         results['distances'][0]
                     ):
-                        relevance_score = 1 / (1 + distance) if self.use_chromadb else 1 - distance
+                        relevance_score = 1 - distance
+                        if relevance_score < RAG_MIN_RELEVANCE:
+                            continue
                         
                         all_results.append({
                             "text": doc,
@@ -303,28 +849,117 @@ class RAGService:
                             "query_variant": enhanced_query
                         })
             
-            seen_chunks = set()
-            filtered_results = []
-            all_results.sort(key=lambda x: x["relevance_score"], reverse=True)
+            keywords = extract_keywords(query)
+            weights = {}
+            for result in all_results:
+                text = result["text"]
+                if text not in weights:
+                    weights[text] = keyword_weight(keywords, text)
+            all_results.sort(key=lambda x: x["relevance_score"] * weights[x["text"]], reverse=True)
             
+            # Max-pool per segment: keep only the best-ranked chunk that starts in each segment
+            seen_segments = set()
+            filtered_results = []
             for result in all_results:
-                chunk_id = f"{result['metadata'].get('segment_index')}_{result['metadata'].get('chunk_index')}"
-                if chunk_id not in seen_chunks and len(filtered_results) < top_k:
-                    seen_chunks.add(chunk_id)
+                segment_index = result["metadata"].get("segment_index")
+                if segment_index not in seen_segments:
+                    seen_segments.add(segment_index)
                     filtered_results.append(result)
+                    if len(filtered_results) == top_k:
+                        break
 
-            return {
+            result = {
                 "success": True,
                 "query": query,
                 "results": filtered_results,
                 "video_id": video_id,
                 "total_variants_searched": len(enhanced_queries)
             }
+            self._search_cache.set(cache_key, result)
+            return result
             
         except Exception as e:
-            logger.error(f"Error searching transcript for {video_id}: {str(e)}")
+            logger.error("Error searching transcript for %s: %s", video_id, e)
             return {"success": False, "error": str(e)}
     
+    def _build_direct_response(self, video_id: str, query: str, search_results: Dict[str, Any],
+                               client: Any) -> Optional[Dict[str, Any]]:
+        if not client:
+            segments = search_results["results"][:5]
+            fallback_answer = "Based on the most relevant transcript segments:\n\n"
+            
+            for i, segment in enumerate(segments, 1):
+                fallback_answer += f"- {format_timestamp(segment.get('timestamp', 0))} {segment['text']}\n"
+            
+            fallback_answer += "\nNote: AI analysis unavailable - showing raw transcript segments"
+            
+            return {
+                "success": True,
+                "query": query,
+                "video_id": video_id,
+                "answer": fallback_answer,
+                "sources": search_results["results"],
+                "retrieval_only": True
+            }
+        
+        if not search_results["results"]:
+            return {
+                "success": True,
+                "query": query,
+                "video_id": video_id,
+                "answer": "No relevant information found in this video for your query. Try rephrasing your question or asking about the general topic.",
+                "sources": [],
+                "retrieval_only": False
+            }
+        
+        return None
+    
+    def _build_rag_messages(self, query: str, all_results: List[Dict[str, Any]]) -> Tuple[List[Dict[str, str]], int]:
+        scores = [r["relevance_score"] for r in all_results]
+        avg_score = sum(scores) / len(scores) if scores else 0
+        
+        high_threshold = max(0.3, avg_score + 0.1)
+        high_relevance = [r for r in all_results if r["relevance_score"] >= high_threshold]
+        medium_relevance = [r for r in all_results if 0.2 <= r["relevance_score"] < high_threshold]
+        
+        context_parts = []
+        
+        if high_relevance:
+            context_parts.append("=== MOST RELEVANT SEGMENTS ===")
+            for result in high_relevance[:10]:
+                context_parts.append(f"{format_timestamp(result.get('timestamp', 0))} {result['text']}")
+        
+        if medium_relevance and len(context_parts) < 15:
+            context_parts.append("\n=== ADDITIONAL CONTEXT ===")
+            for result in medium_relevance[:5]:
+                context_parts.append(f"{format_timestamp(result.get('timestamp', 0))} {result['text']}")
+        
+        if not context_parts:
+            context_parts.append("=== AVAILABLE TRANSCRIPT SEGMENTS ===")
+            for result in all_results[:5]:
+                context_parts.append(f"{format_timestamp(result.get('timestamp', 0))} {result['text']}")
+        
+        context = "\n\n".join(context_parts)
+        
+        messages = [
+            RAG_SYSTEM_MESSAGE,
+            {"role": "user", "content": RAG_USER_PROMPT_TEMPLATE.format(query=query, context=context)}
+        ]
+        return messages, len(high_relevance)
+    
+    def _build_generated_response(self, video_id: str, query: str, search_results: Dict[str, Any],
+                                  answer: str, high_relevance_count: int) -> Dict[str, Any]:
+        return {
+            "success": True,
+            "query": query,
+            "video_id": video_id,
+            "answer": answer,
+            "sources": search_results["results"],
+            "retrieval_only": False,
+            "high_relevance_count": high_relevance_count,
+            "total_sources": len(search_results["results"])
+        }
+    
     def generate_rag_response(self, video_id: str, query: str, top_k: int = 100) -> Dict[str, Any]:
         try:
             search_results = self.search_transcript(video_id, query, top_k)
@@ -332,165 +967,117 @@ class RAGService:
             if not search_results["success"]:
                 return search_results
             
-            if not self.openai_client:
-                segments = search_results["results"][:5]
-                fallback_answer = "Based on the most relevant transcript segments:\n\n"
-                
-                for i, segment in enumerate(segments, 1):
-                    timestamp = segment.get("timestamp", 0)
-                    timestamp_str = f"[{int(timestamp // 60):02d}:{int(timestamp % 60):02d}]"
-                    fallback_answer += f"- {timestamp_str} {segment['text']}\n"
-                
-                fallback_answer += "\nNote: AI analysis unavailable - showing raw transcript segments"
-                
-                return {
-                    "success": True,
-                    "query": query,
-                    "video_id": video_id,
-                    "answer": fallback_answer,
-                    "sources": search_results["results"],
-                    "retrieval_only": True
-                }
-            
-            all_results = search_results["results"]
-            
-            if not all_results:
-                return {
-                    "success": True,
-                    "query": query,
-                    "video_id": video_id,
-                    "answer": "No relevant information found in this video for your query. Try rephrasing your question or asking about the general topic.",
-                    "sources": [],
-                    "retrieval_only": False
-                }
-            
-            scores = [r["relevance_score"] for r in all_results]
-            avg_score = sum(scores) / len(scores) if scores else 0
+            direct_response = self._build_direct_response(video_id, query, search_results, self.openai_client)
+            if direct_response is not None:
+                return direct_response
             
-            high_threshold = max(0.3, avg_score + 0.1)
-            high_relevance = [r for r in all_results if r["relevance_score"] >= high_threshold]
-            medium_relevance = [r for r in all_results if 0.2 <= r["relevance_score"] < high_threshold]
+            messages, high_relevance_count = self._build_rag_messages(query, search_results["results"])
             
-            context_parts = []
+            try:
+                response = self.openai_client.chat.completions.create(
+                    model=self.chat_model,
+                    messages=messages,
+                    temperature=0.1,
+                    max_tokens=1500
+                )
+            except Exception:
+                response = self.openai_client.chat.completions.create(
+                    model=self.fallback_chat_model,
+                    messages=messages,
+                    temperature=0.1,
+                    max_tokens=1500
+                )
             
-            if high_relevance:
-                context_parts.append("=== MOST RELEVANT SEGMENTS ===")
-                for result in high_relevance[:10]:
-                    timestamp = result.get("timestamp", 0)
-                    timestamp_str = f"[{int(timestamp // 60):02d}:{int(timestamp % 60):02d}]"
-                    context_parts.append(f"{timestamp_str} {result['text']}")
+            return self._build_generated_response(
+                video_id, query, search_results, response.choices[0].message.content, high_relevance_count
+            )
             
-            if medium_relevance and len(context_parts) < 15:
-                context_parts.append("\n=== ADDITIONAL CONTEXT ===")
-                for result in medium_relevance[:5]:
-                    timestamp = result.get("timestamp", 0)
-                    timestamp_str = f"[{int(timestamp // 60):02d}:{int(timestamp % 60):02d}]"
-                    context_parts.append(f"{timestamp_str} {result['text']}")
+        except Exception as e:
+            logger.error("Error generating RAG response for %s: %s", video_id, e)
+            return {"success": False, "error": str(e)}
+    
+    async def generate_rag_response_async(self, video_id: str, query: str, top_k: int = 100) -> Dict[str, Any]:
+        try:
+            search_results = await asyncio.to_thread(self.search_transcript, video_id, query, top_k)
             
-            if not context_parts:
-                context_parts.append("=== AVAILABLE TRANSCRIPT SEGMENTS ===")
-                for result in all_results[:5]:
-                    timestamp = result.get("timestamp", 0)
-                    timestamp_str = f"[{int(timestamp // 60):02d}:{int(timestamp % 60):02d}]"
-                    context_parts.append(f"{timestamp_str} {result['text']}")
+            if not search_results["success"]:
+                return search_results
             
-            context = "\n\n".join(context_parts)
+            direct_response = self._build_direct_response(video_id, query, search_results, self.async_openai_client)
+            if direct_response is not None:
+                return direct_response
             
-            system_prompt = """You are a helpful assistant that analyzes podcast transcripts. Provide clear, concise answers.
-
-FORMATTING RULES:
-- Start with the direct answer (1-2 sentences)
-- Use line breaks and clear spacing for readability
-- Be confident and definitive based on evidence
-- Use timestamps strategically when they add value
-
-STRUCTURE:
-1. Direct answer first
-2. Blank line
-3. "Key Points:" (followed by list items with dashes)
-4. Blank line  
-5. "Evidence:" (if timestamps add value)
-
-KEEP IT CONCISE: 150-300 words maximum."""
+            messages, high_relevance_count = self._build_rag_messages(query, search_results["results"])
             
-            user_prompt = f"""Question: {query}
-
-Transcript Segments:
-{context}
-
-Provide a clear, concise answer following this format:
-
-Direct answer (1-2 sentences)
-
-Key Points:
-- First key point
-- Second key point
-- Third key point
-
-Evidence:
-- [timestamp] relevant detail (only if timestamps add value)
-
-Use simple text with line breaks. No markdown formatting."""
-
             try:
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-4-turbo-preview",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
+                response = await self.async_openai_client.chat.completions.create(
+                    model=self.chat_model,
+                    messages=messages,
                     temperature=0.1,
                     max_tokens=1500
                 )
             except Exception:
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
+                response = await self.async_openai_client.chat.completions.create(
+                    model=self.fallback_chat_model,
+                    messages=messages,
                     temperature=0.1,
                     max_tokens=1500
                 )
             
-            return {
-                "success": True,
-                "query": query,
-                "video_id": video_id,
-                "answer": response.choices[0].message.content,
-                "sources": search_results["results"],
-                "retrieval_only": False,
-                "high_relevance_count": len(high_relevance),
-                "total_sources": len(search_results["results"])
-            }
+            return self._build_generated_response(
+                video_id, query, search_results, response.choices[0].message.content, high_relevance_count
+            )
             
         except Exception as e:
-            logger.error(f"Error generating RAG response for {video_id}: {str(e)}")
+            logger.error("Error generating RAG response for %s: %s", video_id, e)
             return {"success": False, "error": str(e)}
     
-    def list_video_collections(self) -> List[Dict[str, Any]]:
+    def _invalidate_collection_list(self):
+        self._collection_generation += 1
+        self._collection_list_cache.pop("all")
+    
+    def _collection_listing(self) -> Tuple[List[Dict[str, Any]], frozenset]:
+        cached = self._collection_list_cache.get("all")
+        if cached is not None:
+            return cached
+        
+        generation = self._collection_generation
         if self.use_chromadb:
             try:
                 collections = self.chroma_client.list_collections()
-                return [{
+                video_collections = [{
                     "name": collection.name.replace("transcript_", ""),
                     "count": collection.count(),
                     "last_updated": collection.metadata.get("last_updated") or collection.metadata.get("created_at")
                 } for collection in collections if collection.name.startswith("transcript_")]
             except Exception as e:
-                logger.error(f"Failed to list ChromaDB collections: {e}")
-                return []
+                logger.error("Failed to list ChromaDB collections: %s", e)
+                return [], frozenset()
         else:
-            return self.vector_store.list_collections()
+            video_collections = self.vector_store.list_collections()
+        
+        listing = (video_collections, frozenset(collection["name"] for collection in video_collections))
+        # A process or delete that finished while the store was being read may be missing from it
+        if generation == self._collection_generation:
+            self._collection_list_cache.set("all", listing)
+        return listing
+    
+    def list_video_collections(self) -> List[Dict[str, Any]]:
+        return list(self._collection_listing()[0])
+    
+    def has_collection(self, video_id: str) -> bool:
+        return video_id in self._collection_listing()[1]
     
     def delete_video_collection(self, video_id: str) -> bool:
         try:
             collection_name = f"transcript_{video_id}"
+            self._invalidate_search_cache(video_id)
             if self.use_chromadb:
                 self.chroma_client.delete_collection(collection_name)
             else:
                 self.vector_store.delete_collection(collection_name)
+            self._invalidate_collection_list()
             return True
         except Exception as e:
-            logger.error(f"Error deleting collection for {video_id}: {str(e)}")
+            logger.error("Error deleting collection for %s: %s", video_id, e)
             return False
\ No newline at end of file
@@ -1,45 +1,253 @@
-from typing import Optional, List
+from typing import Dict, Optional, List, Sequence, Tuple
 import os
+import asyncio
+import aiofiles
+import glob
 import json
+import logging
+import re
 import subprocess
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
+from pymongo import DeleteMany, ReplaceOne
 from ..models.youtube import TranscriptSegment
-from ..models.transcript_db import TranscriptSegmentDB
+from ..models.transcript_db import TranscriptSegmentDB, NO_TRANSCRIPT_SEQUENCE, SEGMENT_INDEX_KEYS
+from .cache import TTLCache
+from .youtube_service import YouTubeService
+from .metrics import record_transcript_cache_hit, record_transcript_cache_miss, record_transcript_extraction
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 try:
     from supadata import Supadata, SupadataError
     SUPADATA_AVAILABLE = True
 except ImportError:
     SUPADATA_AVAILABLE = False
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 try:
     subprocess.run(['yt-dlp', '--version'], capture_output=True, check=True)
     YT_DLP_AVAILABLE = True
 except (subprocess.CalledProcessError, FileNotFoundError):
     YT_DLP_AVAILABLE = False
 
+SEGMENT_TIMESTAMP_ATTRS = ('offset', 'start', 'time', 'timestamp', 'begin', 'start_time')
+
+SEGMENT_TIMESTAMP_KEYS = ('offset', 'start', 'time', 'timestamp', 'begin')
+SEGMENT_REPR_TIMESTAMP_RE = re.compile(r"(offset|start|time|timestamp|begin)=([-+0-9.eE]+)")
+VTT_TAG_RE = re.compile(r'<[^>]+>')
+# A cue timing line followed by its text lines, which run until a blank line or the next timing line
+VTT_CUE_RE = re.compile(
+    r'^[ \t]*(\S+)[ \t]+-->[^\n]*\n?((?:(?![^\n]*-->)[^\n]*\S[^\n]*(?:\n|$))*)',
+    re.MULTILINE
+)
+
+TRANSCRIPT_CACHE_MAX_ENTRIES = 512
+TRANSCRIPT_DB_WRITE_BATCH_SIZE = 500
+TRANSCRIPT_EXTRACTION_WORKERS = 8
+TRANSCRIPT_BULK_CONCURRENCY = 8
+TRANSCRIPT_CACHE_TTL_SECONDS = 3600
+# Segments saved before the language field existed were all extracted with the default language
+LEGACY_TRANSCRIPT_LANGUAGE = "en"
+YTDLP_PLAYER_CLIENT = os.getenv("YTDLP_PLAYER_CLIENT", "web_safari")
+YTDLP_SOCKET_TIMEOUT_SECONDS = 10
+TIMEDTEXT_TIMEOUT_SECONDS = 10
+SUPADATA_API_URL = os.getenv("SUPADATA_API_URL", "https://api.supadata.ai/v1")
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+PLAYER_RESPONSE_RE = re.compile(r'ytInitialPlayerResponse\s*=\s*(\{.+?\})\s*;\s*(?:var\s+meta|</script|\n)', re.DOTALL)
+
 class TranscriptService:
     """Service for extracting YouTube transcripts using multiple fallback methods"""
     
+    # Shared by every instance so a save through one router invalidates reads in the others
+    _db_cache = TTLCache(TRANSCRIPT_CACHE_MAX_ENTRIES, TRANSCRIPT_CACHE_TTL_SECONDS)
+    # Shared so the cap on concurrent outbound extraction calls holds across routers
+    _executor = ThreadPoolExecutor(max_workers=TRANSCRIPT_EXTRACTION_WORKERS, thread_name_prefix="transcript-extract")
+    # Created on first use and shared so caption requests reuse keep-alive connections
+    _http_client = None
+    
     def __init__(self):
+        self.supadata_api_key = os.getenv("SUPADATA_API_KEY")
         if SUPADATA_AVAILABLE:
-            api_key = os.getenv("SUPADATA_API_KEY")
+            api_key = self.supadata_api_key
             if api_key:
                 self.client = Supadata(api_key=api_key)
             else:
                 self.client = None
-                print("Warning: SUPADATA_API_KEY not found, will use fallback methods")
+                logger.warning("SUPADATA_API_KEY not found, will use fallback methods")
         else:
             self.client = None
+        
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._segment_handlers = {dict: self._segment_from_dict, str: self._segment_from_str}
+    
+    async def get_transcript(self, video_id: str, language: str = "en", save_to_db: bool = True) -> dict:
+        """
+        Get a transcript, serving it from MongoDB when it has already been stored
+        
+        On a miss the transcript is extracted with extract_transcript and, when
+        save_to_db is set, written through to MongoDB for the next request. MongoDB
+        holds one transcript per video, so a transcript stored in another language
+        is neither served nor overwritten.
+        
+        Args:
+            video_id: YouTube video ID
+            language: Language code (default: "en")
+            save_to_db: Store a freshly extracted transcript in MongoDB
+            
+        Returns:
+            dict with transcript data and metadata, same shape as extract_transcript
+        """
+        stored = await self.get_transcript_from_db(video_id)
+        stored_language = (stored[0].get("language") or LEGACY_TRANSCRIPT_LANGUAGE) if stored else None
+        if stored_language == language:
+            self.cache_hits += 1
+            record_transcript_cache_hit("database")
+            logger.info("Transcript cache hit for %s (%s): hits=%d misses=%d",
+                        video_id, language, self.cache_hits, self.cache_misses)
+            segments = [TranscriptSegment.model_construct(text=s["text"], timestamp=s["timestamp"]) for s in stored]
+            text = " ".join(segment.text for segment in segments)
+            return {
+                "success": True,
+                "error": None,
+                "transcript": text,
+                "segments": segments,
+                "metadata": {
+                    "video_id": video_id,
+                    "language": language,
+                    "length": len(text),
+                    "segment_count": len(segments),
+                    "timestamp": datetime.now().isoformat(),
+                    "source": "database",
+                    "cache_hit": True
+                }
+            }
+        
+        if await self._has_no_transcript_marker(video_id, language):
+            self.cache_hits += 1
+            record_transcript_cache_hit("no_transcript_marker")
+            logger.info("Negative transcript cache hit for %s (%s)", video_id, language)
+            return {
+                "success": False,
+                "error": "No transcript is available for this video",
+                "transcript": None,
+                "segments": [],
+                "metadata": {"video_id": video_id, "language": language, "no_transcript": True, "cache_hit": True}
+            }
+        
+        self.cache_misses += 1
+        record_transcript_cache_miss()
+        logger.info("Transcript cache miss for %s (%s): hits=%d misses=%d",
+                    video_id, language, self.cache_hits, self.cache_misses)
+        result = await self.extract_transcript(video_id, language)
+        if stored_language is not None:
+            result["metadata"]["stored_language"] = stored_language
+        
+        if save_to_db and not result["success"] and result["metadata"].get("no_transcript"):
+            await self._mark_no_transcript(video_id, language)
+        
+        if save_to_db and result["success"] and result["segments"] and stored_language is None:
+            db_result = await self.save_transcript_to_db(video_id, result["segments"], language)
+            result["metadata"]["db_saved"] = db_result["success"]
+            if db_result["success"]:
+                result["metadata"]["segments_saved"] = db_result["segments_saved"]
+            else:
+                result["metadata"]["db_error"] = db_result["error"]
+        
+        return result
     
-    def extract_transcript(self, video_id: str, language: str = "en") -> dict:
+    async def get_transcripts_bulk(self, video_ids: List[str], language: str = "en", save_to_db: bool = True) -> List[dict]:
+        """
+        Get transcripts for several videos concurrently
+        
+        Freshly extracted transcripts are written to MongoDB together in one
+        bulk write once every video has been fetched.
+        
+        Args:
+            video_ids: YouTube video IDs
+            language: Language code (default: "en")
+            save_to_db: Store freshly extracted transcripts in MongoDB
+            
+        Returns:
+            List of get_transcript results in the same order as video_ids
+        """
+        semaphore = asyncio.Semaphore(TRANSCRIPT_BULK_CONCURRENCY)
+        
+        async def fetch(video_id: str) -> dict:
+            async with semaphore:
+                return await self.get_transcript(video_id, language, save_to_db=False)
+        
+        results = await asyncio.gather(*(fetch(video_id) for video_id in video_ids), return_exceptions=True)
+        results = [
+            {
+                "success": False,
+                "error": f"Unexpected error: {str(result)}",
+                "transcript": None,
+                "segments": [],
+                "metadata": {"video_id": video_id, "language": language}
+            } if isinstance(result, Exception) else result
+            for video_id, result in zip(video_ids, results)
+        ]
+        
+        if save_to_db:
+            await self._save_bulk_results(video_ids, results, language)
+        return results
+    
+    async def _save_bulk_results(self, video_ids: List[str], results: List[dict], language: str):
+        """Write freshly extracted bulk results back to MongoDB in one round trip"""
+        extracted = [
+            (video_id, result) for video_id, result in zip(video_ids, results)
+            if not result["metadata"].get("cache_hit")
+        ]
+        # A transcript already stored in another language is left in place, as in get_transcript
+        transcripts = {
+            video_id: result["segments"] for video_id, result in extracted
+            if result["success"] and result["segments"] and "stored_language" not in result["metadata"]
+        }
+        no_transcript_video_ids = list(dict.fromkeys(
+            video_id for video_id, result in extracted
+            if not result["success"] and result["metadata"].get("no_transcript")
+        ))
+        
+        db_result = await self.save_transcripts_bulk(transcripts, language, no_transcript_video_ids)
+        for video_id, result in extracted:
+            if video_id not in transcripts:
+                continue
+            result["metadata"]["db_saved"] = db_result["success"]
+            if db_result["success"]:
+                result["metadata"]["segments_saved"] = db_result["segments_saved"][video_id]
+            else:
+                result["metadata"]["db_error"] = db_result["error"]
+    
+    async def extract_transcript(self, video_id: str, language: str = "en") -> dict:
         """
         Extract transcript for a given video ID using multiple fallback methods
         
+        Supadata is called over the shared async HTTP client when httpx is
+        installed; otherwise the blocking SDK runs on a bounded worker pool to
+        keep the event loop free and cap concurrent outbound calls. YouTube's
+        caption endpoint is tried next over HTTP, and yt-dlp only runs as an
+        asyncio subprocess when that fails.
+        
         Args:
             video_id: YouTube video ID
             language: Language code (default: "en")
@@ -47,32 +255,67 @@ class TranscriptService:
         Returns:
             dict with transcript data and metadata
         """
-        if SUPADATA_AVAILABLE and self.client:
+        no_transcript_reports = []
+        loop = asyncio.get_running_loop()
+        
+        if (HTTPX_AVAILABLE and self.supadata_api_key) or (SUPADATA_AVAILABLE and self.client):
+            started = time.perf_counter()
+            try:
+                if HTTPX_AVAILABLE and self.supadata_api_key:
+                    result = await self._extract_with_supadata_async(video_id, language)
+                else:
+                    result = await loop.run_in_executor(self._executor, self._extract_with_supadata, video_id, language)
+                record_transcript_extraction("supadata", time.perf_counter() - started, result["success"])
+                if result["success"]:
+                    return result
+                else:
+                    no_transcript_reports.append(result["metadata"].get("no_transcript", False))
+                    logger.info("Supadata failed: %s. Trying fallback methods...", result["error"])
+            except Exception as e:
+                record_transcript_extraction("supadata", time.perf_counter() - started, False)
+                no_transcript_reports.append(False)
+                logger.warning("Supadata error: %s. Trying fallback methods...", e)
+        
+        if HTTPX_AVAILABLE:
+            started = time.perf_counter()
             try:
-                result = self._extract_with_supadata(video_id, language)
+                result = await self._extract_with_timedtext(video_id, language)
+                record_transcript_extraction("timedtext", time.perf_counter() - started, result["success"])
                 if result["success"]:
                     return result
                 else:
-                    print(f"Supadata failed: {result['error']}. Trying fallback methods...")
+                    no_transcript_reports.append(result["metadata"].get("no_transcript", False))
+                    logger.info("Caption endpoint failed: %s. Trying yt-dlp...", result["error"])
             except Exception as e:
-                print(f"Supadata error: {str(e)}. Trying fallback methods...")
+                record_transcript_extraction("timedtext", time.perf_counter() - started, False)
+                no_transcript_reports.append(False)
+                logger.warning("Caption endpoint error: %s. Trying yt-dlp...", e)
         
         if YT_DLP_AVAILABLE:
+            started = time.perf_counter()
             try:
-                result = self._extract_with_ytdlp(video_id, language)
+                result = await self._extract_with_ytdlp(video_id, language)
+                record_transcript_extraction("yt-dlp", time.perf_counter() - started, result["success"])
                 if result["success"]:
                     return result
                 else:
-                    print(f"yt-dlp failed: {result['error']}")
+                    no_transcript_reports.append(result["metadata"].get("no_transcript", False))
+                    logger.info("yt-dlp failed: %s", result["error"])
             except Exception as e:
-                print(f"yt-dlp error: {str(e)}")
+                record_transcript_extraction("yt-dlp", time.perf_counter() - started, False)
+                no_transcript_reports.append(False)
+                logger.warning("yt-dlp error: %s", e)
         
         return {
             "success": False,
             "error": "All transcript extraction methods failed. Supadata limit exceeded and yt-dlp not available or failed.",
             "transcript": None,
             "segments": [],
-            "metadata": {"video_id": video_id, "language": language}
+            "metadata": {
+                "video_id": video_id,
+                "language": language,
+                "no_transcript": bool(no_transcript_reports) and all(no_transcript_reports)
+            }
         }
 
     def _extract_with_supadata(self, video_id: str, language: str = "en") -> dict:
@@ -89,29 +332,7 @@ class TranscriptService:
                 except SupadataError:
                     pass
             
-            if segments_data["segments"] and len(segments_data["text"].strip()) >= 10:
-                return {
-                    "success": True,
-                    "error": None,
-                    "transcript": segments_data["text"],
-                    "segments": segments_data["segments"],
-                    "metadata": {
-                        "video_id": video_id,
-                        "language": language,
-                        "length": len(segments_data["text"]),
-                        "segment_count": len(segments_data["segments"]),
-                        "timestamp": datetime.now().isoformat(),
-                        "source": "supadata"
-                    }
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": "Transcript is empty or too short",
-                    "transcript": None,
-                    "segments": [],
-                    "metadata": {"video_id": video_id, "language": language}
-                }
+            return self._supadata_result(video_id, language, segments_data)
                 
         except SupadataError as e:
             return {
@@ -130,109 +351,310 @@ class TranscriptService:
                 "metadata": {"video_id": video_id, "language": language}
             }
 
-    def _extract_with_ytdlp(self, video_id: str, language: str = "en") -> dict:
+    def _supadata_result(self, video_id: str, language: str, segments_data: dict) -> dict:
+        if segments_data["segments"] and len(segments_data["text"].strip()) >= 10:
+            return {
+                "success": True,
+                "error": None,
+                "transcript": segments_data["text"],
+                "segments": segments_data["segments"],
+                "metadata": {
+                    "video_id": video_id,
+                    "language": language,
+                    "length": len(segments_data["text"]),
+                    "segment_count": len(segments_data["segments"]),
+                    "timestamp": datetime.now().isoformat(),
+                    "source": "supadata"
+                }
+            }
+        return {
+            "success": False,
+            "error": "Transcript is empty or too short",
+            "transcript": None,
+            "segments": [],
+            "metadata": {"video_id": video_id, "language": language, "no_transcript": True}
+        }
+
+    async def _fetch_supadata_content(self, params: dict):
+        response = await self._get_http_client().get(
+            f"{SUPADATA_API_URL}/youtube/transcript",
+            params=params,
+            headers={"x-api-key": self.supadata_api_key}
+        )
+        if response.status_code != 200:
+            raise httpx.HTTPStatusError(
+                f"{response.status_code} {response.text[:200]}",
+                request=response.request,
+                response=response
+            )
+        body = orjson.loads(response.content) if ORJSON_AVAILABLE else response.json()
+        return body.get("content") or []
+
+    async def _extract_with_supadata_async(self, video_id: str, language: str = "en") -> dict:
+        """Extract transcript from Supadata's REST API over the shared keep-alive HTTP client"""
+        try:
+            content = await self._fetch_supadata_content({"videoId": video_id, "lang": language})
+            segments_data = await asyncio.to_thread(self._process_transcript_content_with_timestamps, content)
+            
+            if not segments_data["segments"]:
+                try:
+                    content = await self._fetch_supadata_content({"videoId": video_id, "text": "true"})
+                    segments_data = await asyncio.to_thread(self._process_transcript_content_with_timestamps, content)
+                except httpx.HTTPStatusError:
+                    pass
+            
+            return self._supadata_result(video_id, language, segments_data)
+                
+        except httpx.HTTPStatusError as e:
+            return {
+                "success": False,
+                "error": f"Supadata API error: {str(e)}",
+                "transcript": None,
+                "segments": [],
+                "metadata": {"video_id": video_id, "language": language}
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Unexpected error: {str(e)}",
+                "transcript": None,
+                "segments": [],
+                "metadata": {"video_id": video_id, "language": language}
+            }
+
+    @classmethod
+    def _get_http_client(cls):
+        if cls._http_client is None:
+            cls._http_client = httpx.AsyncClient(
+                timeout=TIMEDTEXT_TIMEOUT_SECONDS,
+                follow_redirects=True,
+                limits=httpx.Limits(max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS),
+                headers={"Accept-Language": "en-US,en;q=0.9", "User-Agent": "Mozilla/5.0"}
+            )
+        return cls._http_client
+
+    @classmethod
+    def open_http_client(cls):
+        if HTTPX_AVAILABLE:
+            cls._get_http_client()
+
+    @classmethod
+    async def close_http_client(cls):
+        if cls._http_client is not None:
+            await cls._http_client.aclose()
+            cls._http_client = None
+
+    def _caption_tracks_from_page(self, html: str) -> Optional[Tuple[Optional[str], list]]:
+        """Read (playability status, caption tracks) from a watch page's ytInitialPlayerResponse, or None if missing"""
+        match = PLAYER_RESPONSE_RE.search(html)
+        if not match:
+            return None
+        player_response = json.loads(match.group(1))
+        status = player_response.get("playabilityStatus", {}).get("status")
+        caption_tracks = (
+            player_response.get("captions", {})
+            .get("playerCaptionsTracklistRenderer", {})
+            .get("captionTracks", [])
+        )
+        return status, caption_tracks
+
+    def _select_caption_track(self, caption_tracks: list, language: str) -> Optional[dict]:
+        """Pick a caption track, preferring the requested language and manual captions over ASR"""
+        for lang in dict.fromkeys((language, "en")):
+            tracks = [track for track in caption_tracks if track.get("languageCode") == lang]
+            if tracks:
+                return min(tracks, key=lambda track: track.get("kind") == "asr")
+        return None
+
+    async def _extract_with_timedtext(self, video_id: str, language: str = "en") -> dict:
+        """Extract transcript from YouTube's JSON3 caption endpoint without spawning yt-dlp"""
+        failure = {
+            "success": False,
+            "error": None,
+            "transcript": None,
+            "segments": [],
+            "metadata": {"video_id": video_id, "language": language}
+        }
+        client = self._get_http_client()
+        
+        page = await client.get(f"https://www.youtube.com/watch?v={video_id}")
+        page.raise_for_status()
+        player_captions = await asyncio.to_thread(self._caption_tracks_from_page, page.text)
+        if player_captions is None:
+            failure["error"] = "Player response not found in watch page"
+            return failure
+        status, caption_tracks = player_captions
+        if not caption_tracks:
+            # Bot-check, login, age-gate and consent pages also carry no captions, so only a
+            # playable video without tracks is known to have no transcript
+            if status != "OK":
+                failure["error"] = f"Watch page not playable: {status}"
+                return failure
+            failure["error"] = "Video has no caption tracks"
+            failure["metadata"]["no_transcript"] = True
+            return failure
+        
+        track = self._select_caption_track(caption_tracks, language)
+        if track is None or not track.get("baseUrl"):
+            failure["error"] = f"No caption track for language {language}"
+            return failure
+        
+        captions = await client.get(track["baseUrl"], params={"fmt": "json3"})
+        captions.raise_for_status()
+        if not captions.content:
+            failure["error"] = "Caption endpoint returned an empty body"
+            return failure
+        
+        segments = await asyncio.to_thread(self._parse_json3_bytes, captions.content)
+        if not segments:
+            failure["error"] = "Caption track had no text"
+            return failure
+        
+        text_content = " ".join(seg.text for seg in segments)
+        return {
+            "success": True,
+            "error": None,
+            "transcript": text_content,
+            "segments": segments,
+            "metadata": {
+                "video_id": video_id,
+                "language": language,
+                "length": len(text_content),
+                "segment_count": len(segments),
+                "timestamp": datetime.now().isoformat(),
+                "source": "timedtext"
+            }
+        }
+
+    async def _extract_with_ytdlp(self, video_id: str, language: str = "en") -> dict:
         """Extract transcript using yt-dlp as fallback"""
+        sub_langs = list(dict.fromkeys((language, 'en')))
+        video_info = YouTubeService.get_cached_video_info(video_id)
+        if video_info is not None:
+            sub_langs = [lang for lang in sub_langs if lang in video_info.available_languages]
+            if not sub_langs:
+                return {
+                    "success": False,
+                    "error": "No subtitles in the requested languages",
+                    "transcript": None,
+                    "segments": [],
+                    "metadata": {"video_id": video_id, "language": language, "no_transcript": True}
+                }
+        
         try:
             cmd = [
                 'yt-dlp',
                 f'https://www.youtube.com/watch?v={video_id}',
                 '--write-auto-sub',
                 '--write-sub',
-                '--sub-langs', f'{language},en',
+                '--sub-langs', ','.join(sub_langs),
                 '--skip-download',
                 '--sub-format', 'json3',
+                '--extractor-args', f'youtube:player_client={YTDLP_PLAYER_CLIENT}',
+                '--socket-timeout', str(YTDLP_SOCKET_TIMEOUT_SECONDS),
                 '--output', f'%(id)s.%(ext)s'
             ]
+            # Any value in YTDLP_NO_LAZY_EXTRACTORS makes yt-dlp import every extractor on startup
+            env = {k: v for k, v in os.environ.items() if k != 'YTDLP_NO_LAZY_EXTRACTORS'}
             
             with tempfile.TemporaryDirectory() as temp_dir:
-                old_cwd = os.getcwd()
-                os.chdir(temp_dir)
-                
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    cwd=temp_dir,
+                    env=env,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
                 try:
-                    result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-                    
-                    subtitle_files = []
-                    for file in os.listdir('.'):
-                        if file.startswith(video_id) and ('.json3' in file or '.vtt' in file):
-                            subtitle_files.append(file)
-                    
-                    if not subtitle_files:
-                        return {
-                            "success": False,
-                            "error": "No subtitle files found",
-                            "transcript": None,
-                            "segments": [],
-                            "metadata": {"video_id": video_id, "language": language}
-                        }
-                    
-                    for subtitle_file in subtitle_files:
-                        if '.json3' in subtitle_file:
-                            try:
-                                with open(subtitle_file, 'r', encoding='utf-8') as f:
-                                    subtitle_data = json.load(f)
-                                
-                                segments = self._parse_json3_subtitles(subtitle_data)
-                                if segments:
-                                    text_content = " ".join([seg.text for seg in segments])
-                                    
-                                    return {
-                                        "success": True,
-                                        "error": None,
-                                        "transcript": text_content,
-                                        "segments": segments,
-                                        "metadata": {
-                                            "video_id": video_id,
-                                            "language": language,
-                                            "length": len(text_content),
-                                            "segment_count": len(segments),
-                                            "timestamp": datetime.now().isoformat(),
-                                            "source": "yt-dlp"
-                                        }
-                                    }
-                            except Exception as e:
-                                print(f"Error parsing JSON3 subtitle file: {e}")
-                                continue
-                    
-                    for subtitle_file in subtitle_files:
-                        if '.vtt' in subtitle_file:
-                            try:
-                                with open(subtitle_file, 'r', encoding='utf-8') as f:
-                                    vtt_content = f.read()
-                                
-                                segments = self._parse_vtt_subtitles(vtt_content)
-                                if segments:
-                                    text_content = " ".join([seg.text for seg in segments])
-                                    
-                                    return {
-                                        "success": True,
-                                        "error": None,
-                                        "transcript": text_content,
-                                        "segments": segments,
-                                        "metadata": {
-                                            "video_id": video_id,
-                                            "language": language,
-                                            "length": len(text_content),
-                                            "segment_count": len(segments),
-                                            "timestamp": datetime.now().isoformat(),
-                                            "source": "yt-dlp"
-                                        }
-                                    }
-                            except Exception as e:
-                                print(f"Error parsing VTT subtitle file: {e}")
-                                continue
-                    
+                    await asyncio.wait_for(proc.communicate(), timeout=30)
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+                    raise
+                
+                subtitle_files = (
+                    glob.glob(os.path.join(glob.escape(temp_dir), f'{glob.escape(video_id)}*.json3'))
+                    + glob.glob(os.path.join(glob.escape(temp_dir), f'{glob.escape(video_id)}*.vtt'))
+                )
+                
+                if not subtitle_files:
                     return {
                         "success": False,
-                        "error": "Could not parse any subtitle files",
+                        "error": "No subtitle files found",
                         "transcript": None,
                         "segments": [],
-                        "metadata": {"video_id": video_id, "language": language}
+                        "metadata": {
+                            "video_id": video_id,
+                            "language": language,
+                            "no_transcript": proc.returncode == 0
+                        }
                     }
-                    
-                finally:
-                    os.chdir(old_cwd)
-                    
-        except subprocess.TimeoutExpired:
+                
+                for subtitle_file in subtitle_files:
+                    if '.json3' in subtitle_file:
+                        try:
+                            async with aiofiles.open(subtitle_file, 'rb') as f:
+                                raw = await f.read()
+                            
+                            segments = await asyncio.to_thread(self._parse_json3_bytes, raw)
+                            if segments:
+                                text_content = " ".join([seg.text for seg in segments])
+                                
+                                return {
+                                    "success": True,
+                                    "error": None,
+                                    "transcript": text_content,
+                                    "segments": segments,
+                                    "metadata": {
+                                        "video_id": video_id,
+                                        "language": language,
+                                        "length": len(text_content),
+                                        "segment_count": len(segments),
+                                        "timestamp": datetime.now().isoformat(),
+                                        "source": "yt-dlp"
+                                    }
+                                }
+                        except Exception as e:
+                            logger.warning("Error parsing JSON3 subtitle file: %s", e)
+                            continue
+                
+                for subtitle_file in subtitle_files:
+                    if '.vtt' in subtitle_file:
+                        try:
+                            async with aiofiles.open(subtitle_file, 'r', encoding='utf-8') as f:
+                                vtt_content = await f.read()
+                            
+                            segments = await asyncio.to_thread(self._parse_vtt_subtitles, vtt_content)
+                            if segments:
+                                text_content = " ".join([seg.text for seg in segments])
+                                
+                                return {
+                                    "success": True,
+                                    "error": None,
+                                    "transcript": text_content,
+                                    "segments": segments,
+                                    "metadata": {
+                                        "video_id": video_id,
+                                        "language": language,
+                                        "length": len(text_content),
+                                        "segment_count": len(segments),
+                                        "timestamp": datetime.now().isoformat(),
+                                        "source": "yt-dlp"
+                                    }
+                                }
+                        except Exception as e:
+                            logger.warning("Error parsing VTT subtitle file: %s", e)
+                            continue
+                
+                return {
+                    "success": False,
+                    "error": "Could not parse any subtitle files",
+                    "transcript": None,
+                    "segments": [],
+                    "metadata": {"video_id": video_id, "language": language}
+                }
+                
+        except asyncio.TimeoutError:
             return {
                 "success": False,
                 "error": "yt-dlp operation timed out",
@@ -249,29 +671,32 @@ class TranscriptService:
                 "metadata": {"video_id": video_id, "language": language}
             }
 
+    def _parse_json3_bytes(self, raw: bytes) -> List[TranscriptSegment]:
+        """Decode a JSON3 subtitle payload and parse it into segments"""
+        subtitle_data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+        return self._parse_json3_subtitles(subtitle_data)
+
     def _parse_json3_subtitles(self, subtitle_data) -> List[TranscriptSegment]:
-        """Parse JSON3 subtitle format from yt-dlp"""
+        """
+        Parse JSON3 subtitle format from yt-dlp
+        
+        Segments are built with model_construct: text is always a str and the
+        timestamp a float here, so per-segment validation would only cost time.
+        """
         segments = []
+        add_segment = segments.append
         
         try:
-            if 'events' in subtitle_data:
-                for event in subtitle_data['events']:
-                    if 'segs' in event and event.get('tStartMs') is not None:
-                        text_parts = []
-                        for seg in event['segs']:
-                            if 'utf8' in seg:
-                                text_parts.append(seg['utf8'])
-                        
-                        if text_parts:
-                            text = ''.join(text_parts).strip()
-                            if text and text not in ['\n', ' ', '']:
-                                timestamp = event['tStartMs'] / 1000.0
-                                segments.append(TranscriptSegment(
-                                    text=text,
-                                    timestamp=timestamp
-                                ))
+            for event in subtitle_data.get('events', ()):
+                if 'segs' in event and event.get('tStartMs') is not None:
+                    text = ''.join(seg['utf8'] for seg in event['segs'] if 'utf8' in seg).strip()
+                    if text:
+                        add_segment(TranscriptSegment.model_construct(
+                            text=text,
+                            timestamp=event['tStartMs'] / 1000.0
+                        ))
         except Exception as e:
-            print(f"Error parsing JSON3 format: {e}")
+            logger.warning("Error parsing JSON3 format: %s", e)
         
         return segments
 
@@ -280,39 +705,17 @@ class TranscriptService:
         segments = []
         
         try:
-            lines = vtt_content.split('\n')
-            i = 0
-            
-            while i < len(lines):
-                line = lines[i].strip()
-                
-                if '-->' in line:
-                    timestamp_parts = line.split(' --> ')
-                    if len(timestamp_parts) == 2:
-                        start_time = self._parse_vtt_timestamp(timestamp_parts[0])
-                        
-                        i += 1
-                        text_parts = []
-                        while i < len(lines) and lines[i].strip() and '-->' not in lines[i]:
-                            text_line = lines[i].strip()
-                            text_line = self._clean_vtt_text(text_line)
-                            if text_line:
-                                text_parts.append(text_line)
-                            i += 1
-                        
-                        if text_parts:
-                            text = ' '.join(text_parts)
-                            if text:
-                                segments.append(TranscriptSegment(
-                                    text=text,
-                                    timestamp=start_time
-                                ))
-                        continue
-                
-                i += 1
-                
+            for match in VTT_CUE_RE.finditer(vtt_content):
+                text = ' '.join(filter(None, (
+                    self._clean_vtt_text(line) for line in match.group(2).splitlines()
+                )))
+                if text:
+                    segments.append(TranscriptSegment.model_construct(
+                        text=text,
+                        timestamp=self._parse_vtt_timestamp(match.group(1))
+                    ))
         except Exception as e:
-            print(f"Error parsing VTT format: {e}")
+            logger.warning("Error parsing VTT format: %s", e)
         
         return segments
 
@@ -339,9 +742,7 @@ class TranscriptService:
 
     def _clean_vtt_text(self, text: str) -> str:
         """Remove VTT formatting tags from text"""
-        import re
-        text = re.sub(r'<[^>]+>', '', text)
-        return text.strip()
+        return VTT_TAG_RE.sub('', text).strip()
 
     def _process_transcript_content_with_timestamps(self, content) -> dict:
         """
@@ -357,11 +758,9 @@ class TranscriptService:
         text_content = ""
         
         if isinstance(content, list):
-            for item in content:
-                segment = self._extract_segment_data(item)
-                if segment:
-                    segments.append(segment)
-                    text_content += segment.text + " "
+            extract = self._extract_segment_data
+            segments = [segment for segment in map(extract, content) if segment]
+            text_content = " ".join(segment.text for segment in segments)
         elif isinstance(content, str):
             segments.append(TranscriptSegment(text=content.strip()))
             text_content = content.strip()
@@ -383,26 +782,34 @@ class TranscriptService:
         Returns:
             TranscriptSegment object or None
         """
+        handler = self._segment_handlers.get(type(item), self._segment_from_object)
+        return handler(item)
+    
+    def _segment_from_dict(self, item: dict) -> TranscriptSegment:
+        timestamp_ms = next((item[key] for key in SEGMENT_TIMESTAMP_KEYS if item.get(key) is not None), None)
+        timestamp = None
+        if timestamp_ms is not None:
+            timestamp = timestamp_ms / 1000.0  
+        
+        return TranscriptSegment(
+            text=item.get('text', ''),
+            timestamp=timestamp
+        )
+    
+    def _segment_from_str(self, item: str) -> TranscriptSegment:
+        return TranscriptSegment(text=item)
+    
+    def _segment_from_object(self, item) -> TranscriptSegment:
         if isinstance(item, dict):
-            timestamp_ms = item.get('offset') or item.get('start') or item.get('time') or item.get('timestamp') or item.get('begin')
-            timestamp = None
-            if timestamp_ms is not None:
-                timestamp = timestamp_ms / 1000.0  
-            
-            return TranscriptSegment(
-                text=item.get('text', ''),
-                timestamp=timestamp
-            )
+            return self._segment_from_dict(item)
         elif isinstance(item, str):
-            return TranscriptSegment(text=item)
+            return self._segment_from_str(item)
         elif hasattr(item, 'text'):
-            timestamp = None
-            for attr_name in ['offset', 'start', 'time', 'timestamp', 'begin', 'start_time']:
-                if hasattr(item, attr_name):
-                    timestamp_ms = getattr(item, attr_name, None)
-                    if timestamp_ms is not None:
-                        timestamp = timestamp_ms / 1000.0  
-                        break
+            timestamp_ms = next(
+                (value for value in (getattr(item, attr, None) for attr in SEGMENT_TIMESTAMP_ATTRS) if value is not None),
+                None
+            )
+            timestamp = timestamp_ms / 1000.0 if timestamp_ms is not None else None
             
             return TranscriptSegment(
                 text=getattr(item, 'text', ''),
@@ -410,42 +817,29 @@ class TranscriptService:
             )
         else:
             item_str = str(item)
-            text = ""
-            timestamp = None
+            text = item_str
+            if "text=" in item_str:
+                for quote in ("'", '"'):
+                    _, marker, rest = item_str.partition(f"text={quote}")
+                    if marker:
+                        quoted, closing, _ = rest.partition(f"{quote},")
+                        if closing:
+                            text = quoted
+                        break
             
-            if "text='" in item_str:
-                text_start = item_str.find("text='") + 6
-                text_end = item_str.find("',", text_start)
-                if text_end != -1:
-                    text = item_str[text_start:text_end]
-                else:
-                    text = item_str
-            elif "text=\"" in item_str:
-                text_start = item_str.find('text="') + 6
-                text_end = item_str.find('",', text_start)
-                if text_end != -1:
-                    text = item_str[text_start:text_end]
-                else:
-                    text = item_str
-            else:
-                text = item_str
+            found = {}
+            if "=" in item_str:
+                for key, value in SEGMENT_REPR_TIMESTAMP_RE.findall(item_str):
+                    found.setdefault(key, value)
             
-            timestamp_patterns = ["offset=", "start=", "time=", "timestamp=", "begin="]
-            for pattern in timestamp_patterns:
-                if pattern in item_str:
-                    start_pos = item_str.find(pattern) + len(pattern)
-                    start_end = item_str.find(",", start_pos)
-                    if start_end == -1:
-                        start_end = item_str.find(")", start_pos)
-                    if start_end == -1:
-                        start_end = item_str.find(" ", start_pos)
-                    if start_end != -1:
-                        try:
-                            timestamp_ms = float(item_str[start_pos:start_end])
-                            timestamp = timestamp_ms / 1000.0  
-                            break
-                        except ValueError:
-                            continue
+            timestamp = None
+            for key in SEGMENT_TIMESTAMP_KEYS:
+                if key in found:
+                    try:
+                        timestamp = float(found[key]) / 1000.0
+                        break
+                    except ValueError:
+                        continue
             
             return TranscriptSegment(
                 text=text,
@@ -465,7 +859,7 @@ class TranscriptService:
         result = self._process_transcript_content_with_timestamps(content)
         return result["text"]
     
-    def save_transcript_to_file(self, transcript_data, video_id: str, directory: str = "transcripts") -> Optional[str]:
+    async def save_transcript_to_file(self, transcript_data, video_id: str, directory: str = "transcripts") -> Optional[str]:
         """
         Save transcript with timestamps to a file
         
@@ -478,70 +872,104 @@ class TranscriptService:
             Filepath if successful, None if failed
         """
         try:
-            os.makedirs(directory, exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            await asyncio.to_thread(os.makedirs, directory, exist_ok=True)
+            now = datetime.now()
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
             filename = f"{directory}/{video_id}_transcript_with_timestamps_{timestamp}.txt"
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                if hasattr(transcript_data, 'segments') and hasattr(transcript_data, 'video_id'):
-                    f.write(f"Transcript for Video ID: {transcript_data.video_id}\n")
-                    f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write("=" * 50 + "\n\n")
-                    
-                    for segment in transcript_data.segments:
-                        if segment.timestamp is not None:
-                            minutes = int(segment.timestamp // 60)
-                            seconds = int(segment.timestamp % 60)
-                            if minutes >= 60:
-                                hours = minutes // 60
-                                minutes = minutes % 60
-                                timestamp_str = f"[{hours:02d}:{minutes:02d}:{seconds:02d}]"
-                            else:
-                                timestamp_str = f"[{minutes:02d}:{seconds:02d}]"
-                            f.write(f"{timestamp_str} {segment.text}\n")
-                        else:
-                            f.write(f"[--:--] {segment.text}\n")
-                else:
-                    f.write(str(transcript_data))
+            if hasattr(transcript_data, 'segments') and hasattr(transcript_data, 'video_id'):
+                lines = [
+                    f"Transcript for Video ID: {transcript_data.video_id}\n",
+                    f"Generated on: {now.strftime('%Y-%m-%d %H:%M:%S')}\n",
+                    "=" * 50 + "\n\n"
+                ]
+                format_timestamp = self._format_file_timestamp
+                lines.extend(
+                    f"{format_timestamp(segment.timestamp)} {segment.text}\n"
+                    for segment in transcript_data.segments
+                )
+                payload = "".join(lines)
+            else:
+                payload = str(transcript_data)
+            
+            async with aiofiles.open(filename, 'w', encoding='utf-8') as f:
+                await f.write(payload)
             
             return filename
         except Exception as e:
-            print(f"Failed to save transcript: {e}")
+            logger.error("Failed to save transcript: %s", e)
             return None
     
-    async def save_transcript_to_db(self, video_id: str, segments: List[TranscriptSegment]) -> dict:
+    async def _has_no_transcript_marker(self, video_id: str, language: str) -> bool:
+        try:
+            marker = await TranscriptSegmentDB.get_motor_collection().find_one(
+                {"video_id": video_id, "sequence": NO_TRANSCRIPT_SEQUENCE, "language": language},
+                projection={"_id": 1}
+            )
+            return marker is not None
+        except Exception:
+            return False
+    
+    def _no_transcript_op(self, video_id: str, language: str) -> ReplaceOne:
+        return ReplaceOne(
+            {"video_id": video_id, "sequence": NO_TRANSCRIPT_SEQUENCE},
+            {
+                "video_id": video_id,
+                "sequence": NO_TRANSCRIPT_SEQUENCE,
+                "text": "",
+                "timestamp": None,
+                "language": language,
+                "created_at": datetime.utcnow()
+            },
+            upsert=True
+        )
+    
+    async def _mark_no_transcript(self, video_id: str, language: str):
+        try:
+            await TranscriptSegmentDB.get_motor_collection().bulk_write([self._no_transcript_op(video_id, language)])
+        except Exception as e:
+            logger.warning("Failed to record missing transcript for %s: %s", video_id, e)
+    
+    def _format_file_timestamp(self, timestamp: Optional[float]) -> str:
+        if timestamp is None:
+            return "[--:--]"
+        hours, remainder = divmod(int(timestamp), 3600)
+        minutes, seconds = divmod(remainder, 60)
+        if hours:
+            return f"[{hours:02d}:{minutes:02d}:{seconds:02d}]"
+        return f"[{minutes:02d}:{seconds:02d}]"
+    
+    async def save_transcript_to_db(self, video_id: str, segments: List[TranscriptSegment],
+                                    language: Optional[str] = None) -> dict:
         """
         Save video ID and transcript segments to MongoDB
         
         Args:
             video_id: YouTube video ID
             segments: List of transcript segments with timestamps
+            language: Language code the transcript was extracted in
             
         Returns:
             Dictionary with save results
         """
+        self._db_cache.pop(video_id)
         try:
-            await TranscriptSegmentDB.find(
-                TranscriptSegmentDB.video_id == video_id
-            ).delete()
+            created_at = datetime.utcnow()
+            collection = TranscriptSegmentDB.get_motor_collection()
             
-            segment_docs = []
-            for i, segment in enumerate(segments):
-                segment_doc = TranscriptSegmentDB(
-                    video_id=video_id,
-                    sequence=i,
-                    text=segment.text,
-                    timestamp=segment.timestamp
+            for batch_start in range(0, len(segments), TRANSCRIPT_DB_WRITE_BATCH_SIZE):
+                batch = segments[batch_start:batch_start + TRANSCRIPT_DB_WRITE_BATCH_SIZE]
+                await collection.bulk_write(
+                    self._segment_write_ops(video_id, batch, language, created_at, start=batch_start),
+                    ordered=False
                 )
-                segment_docs.append(segment_doc)
             
-            if segment_docs:
-                await TranscriptSegmentDB.insert_many(segment_docs)
+            await collection.delete_many(self._stale_segments_filter(video_id, len(segments)))
             
             return {
                 "success": True,
                 "video_id": video_id,
-                "segments_saved": len(segment_docs)
+                "segments_saved": len(segments)
             }
             
         except Exception as e:
@@ -549,6 +977,78 @@ class TranscriptService:
                 "success": False,
                 "error": f"Failed to save transcript to database: {str(e)}"
             }
+        finally:
+            # A read that landed between batches may have cached a partial transcript
+            self._db_cache.pop(video_id)
+    
+    async def save_transcripts_bulk(self, transcripts: Dict[str, List[TranscriptSegment]],
+                                    language: Optional[str] = None,
+                                    no_transcript_video_ids: Sequence[str] = ()) -> dict:
+        """
+        Save transcripts for several videos to MongoDB in a single bulk_write
+        
+        Args:
+            transcripts: Transcript segments keyed by YouTube video ID
+            language: Language code the transcripts were extracted in
+            no_transcript_video_ids: Videos to record as having no transcript
+            
+        Returns:
+            Dictionary with save results and segments saved per video
+        """
+        for video_id in transcripts:
+            self._db_cache.pop(video_id)
+        
+        created_at = datetime.utcnow()
+        operations = []
+        for video_id, segments in transcripts.items():
+            operations.extend(self._segment_write_ops(video_id, segments, language, created_at))
+            operations.append(DeleteMany(self._stale_segments_filter(video_id, len(segments))))
+        operations.extend(self._no_transcript_op(video_id, language) for video_id in no_transcript_video_ids)
+        
+        if not operations:
+            return {"success": True, "segments_saved": {}}
+        
+        try:
+            # Upserts and deletes for a video touch disjoint sequence numbers, so order does not matter
+            await TranscriptSegmentDB.get_motor_collection().bulk_write(operations, ordered=False)
+            return {
+                "success": True,
+                "segments_saved": {video_id: len(segments) for video_id, segments in transcripts.items()}
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to save transcripts to database: {str(e)}"
+            }
+        finally:
+            # Reads racing the bulk write may have cached a partial transcript
+            for video_id in transcripts:
+                self._db_cache.pop(video_id)
+    
+    def _segment_write_ops(self, video_id: str, segments: List[TranscriptSegment], language: Optional[str],
+                           created_at: datetime, start: int = 0) -> List[ReplaceOne]:
+        return [
+            ReplaceOne(
+                {"video_id": video_id, "sequence": i},
+                {
+                    "video_id": video_id,
+                    "sequence": i,
+                    "text": segment.text,
+                    "timestamp": segment.timestamp,
+                    "language": language,
+                    "created_at": created_at
+                },
+                upsert=True
+            )
+            for i, segment in enumerate(segments, start=start)
+        ]
+    
+    def _stale_segments_filter(self, video_id: str, segment_count: int) -> dict:
+        """Match segments past the end of a freshly saved transcript, plus its no-transcript marker"""
+        return {
+            "video_id": video_id,
+            "$or": [{"sequence": {"$gte": segment_count}}, {"sequence": NO_TRANSCRIPT_SEQUENCE}]
+        }
     
     async def get_transcript_from_db(self, video_id: str) -> Optional[List[dict]]:
         """
@@ -560,23 +1060,22 @@ class TranscriptService:
         Returns:
             List of transcript segments or None
         """
+        cached = self._db_cache.get(video_id)
+        if cached is not None:
+            return cached
+        
         try:
-            segments = await TranscriptSegmentDB.find(
-                TranscriptSegmentDB.video_id == video_id
-            ).sort(TranscriptSegmentDB.sequence).to_list()
+            cursor = TranscriptSegmentDB.get_motor_collection().find(
+                {"video_id": video_id, "sequence": {"$gte": 0}},
+                projection={"_id": 0, "sequence": 1, "text": 1, "timestamp": 1, "language": 1, "created_at": 1}
+            ).hint(SEGMENT_INDEX_KEYS).sort("sequence", 1)
+            segments = await cursor.to_list(length=None)
             
             if not segments:
                 return None
             
-            return [
-                {
-                    "sequence": segment.sequence,
-                    "text": segment.text,
-                    "timestamp": segment.timestamp,
-                    "created_at": segment.created_at
-                }
-                for segment in segments
-            ]
+            self._db_cache.set(video_id, segments)
+            return segments
             
         except Exception as e:
             return None
@@ -1,45 +1,93 @@
+import logging
+import threading
 import yt_dlp
-from typing import List
+from typing import List, Optional
 from ..models.youtube import YouTubeVideo
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+YOUTUBE_CACHE_MAX_ENTRIES = 512
+YOUTUBE_CACHE_TTL_SECONDS = 600
+
+YDL_SEARCH_OPTIONS = {
+    'quiet': True,
+    'no_warnings': True,
+    'extract_flat': False,
+    'default_search': 'ytsearch',
+}
+YDL_INFO_OPTIONS = {'quiet': True, 'no_warnings': True}
 
 class YouTubeService:
+    _search_cache = TTLCache(YOUTUBE_CACHE_MAX_ENTRIES, YOUTUBE_CACHE_TTL_SECONDS)
+    _video_info_cache = TTLCache(YOUTUBE_CACHE_MAX_ENTRIES, YOUTUBE_CACHE_TTL_SECONDS)
+    # YoutubeDL instances are expensive to build and not thread-safe, so keep one per thread and option set
+    _ydl_instances = threading.local()
+    
+    @staticmethod
+    def _get_ydl(name: str, options: dict) -> yt_dlp.YoutubeDL:
+        ydl = getattr(YouTubeService._ydl_instances, name, None)
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL(dict(options))
+            setattr(YouTubeService._ydl_instances, name, ydl)
+        return ydl
+    
+    @staticmethod
+    def warm_up():
+        """Build the shared YoutubeDL instances and load the YouTube extractors before the first request"""
+        for name, options, extractors in (
+            ('search', YDL_SEARCH_OPTIONS, ('YoutubeSearch', 'Youtube')),
+            ('info', YDL_INFO_OPTIONS, ('Youtube',)),
+        ):
+            ydl = YouTubeService._get_ydl(name, options)
+            for extractor in extractors:
+                ydl.get_info_extractor(extractor)
+    
     @staticmethod
     def search_videos(query: str, max_results: int = 5) -> List[YouTubeVideo]:
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': False,
-            'default_search': 'ytsearch',
-        }
+        cache_key = (query, max_results)
+        cached = YouTubeService._search_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
         
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                search_results = ydl.extract_info(f"ytsearch{max_results}:{query}", download=False)
-                
-                videos = []
-                if 'entries' in search_results:
-                    for entry in search_results['entries']:
-                        if entry:
-                            videos.append(YouTubeService.extract_basic_video_info(entry))
-                
-                return videos
+            ydl = YouTubeService._get_ydl('search', YDL_SEARCH_OPTIONS)
+            search_results = ydl.extract_info(f"ytsearch{max_results}:{query}", download=False)
+            
+            videos = []
+            if 'entries' in search_results:
+                for entry in search_results['entries']:
+                    if entry:
+                        videos.append(YouTubeService.extract_basic_video_info(entry))
+            
+            YouTubeService._search_cache.set(cache_key, videos)
+            return list(videos)
         except Exception as e:
-            print(f"Search error: {e}")
+            logger.error("Search error: %s", e)
             return []
     
     @staticmethod
     def get_video_info(video_id: str) -> YouTubeVideo:
-        ydl_opts = {'quiet': True, 'no_warnings': True}
+        cached = YouTubeService._video_info_cache.get(video_id)
+        if cached is not None:
+            return cached
         
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                url = f"https://www.youtube.com/watch?v={video_id}"
-                entry = ydl.extract_info(url, download=False)
-                return YouTubeService.extract_basic_video_info(entry)
+            ydl = YouTubeService._get_ydl('info', YDL_INFO_OPTIONS)
+            url = f"https://www.youtube.com/watch?v={video_id}"
+            entry = ydl.extract_info(url, download=False)
+            video = YouTubeService.extract_basic_video_info(entry)
+            YouTubeService._video_info_cache.set(video_id, video)
+            return video
         except Exception as e:
-            print(f"Video info error: {e}")
+            logger.error("Video info error: %s", e)
             raise Exception(f"Video not found: {video_id}")
     
+    @staticmethod
+    def get_cached_video_info(video_id: str) -> Optional[YouTubeVideo]:
+        """Return video info already fetched by get_video_info without going to YouTube"""
+        return YouTubeService._video_info_cache.get(video_id)
+    
     @staticmethod
     def extract_basic_video_info(entry: dict) -> YouTubeVideo:
         available_languages = []
@@ -1,36 +1,64 @@
+import asyncio
+import importlib.util
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 from .api import youtube, transcripts, rag
 from .core.database import connect_to_mongo, close_mongo_connection
+from .core.logging_setup import start_queue_logging, stop_queue_logging
+from .core.metrics import PROMETHEUS_AVAILABLE, make_asgi_app
+from .core.rag_service import RAGService
+from .core.transcript_service import TranscriptService
+from .core.youtube_service import YouTubeService
+
+# ORJSONResponse imports orjson itself and fails on render without it, so only check it is installed
+ORJSON_AVAILABLE = importlib.util.find_spec("orjson") is not None
+
+# Comma-separated list of browser origins allowed to send credentials; unset keeps the open "*" policy
+FRONTEND_ORIGINS = [origin.strip() for origin in os.getenv("FRONTEND_ORIGINS", "").split(",") if origin.strip()]
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-
+    start_queue_logging()
     try:
         await connect_to_mongo()
         print("MongoDB connection established successfully")
     except Exception as e:
         print(f"MongoDB connection failed: {e}. Some features may be limited.")
+    # Runs on the event loop thread because the YoutubeDL instances are kept per thread
+    try:
+        YouTubeService.warm_up()
+    except Exception as e:
+        print(f"yt-dlp warm-up failed: {e}")
+    TranscriptService.open_http_client()
+    # Loading the embedding model is slow, so build the shared RAG service off the event loop
+    app.state.rag_service = await asyncio.to_thread(RAGService)
     yield
     try:
         await close_mongo_connection()
         print("MongoDB connection closed")
     except Exception as e:
         print(f"Error closing MongoDB connection: {e}")
+    await TranscriptService.close_http_client()
     print("App shutdown")
+    stop_queue_logging()
 
 app = FastAPI(
     title="PodSearch Backend API",
     description="API for podcast and video search, transcription, content querying, and fact verification with MongoDB storage",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
 )
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    # "*" with credentials is rejected by browsers and makes Starlette echo the Origin per request,
+    # so credentials are only allowed for an explicit origin list
+    allow_origins=FRONTEND_ORIGINS or ["*"],
+    allow_credentials=bool(FRONTEND_ORIGINS),
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -39,6 +67,9 @@ app.include_router(youtube.router, prefix="/api/youtube", tags=["YouTube"])
 app.include_router(transcripts.router, prefix="/api/transcripts", tags=["Transcripts"])
 app.include_router(rag.router, prefix="/api/rag", tags=["RAG"])
 
+if PROMETHEUS_AVAILABLE:
+    app.mount("/metrics", make_asgi_app())
+
 
 
 @app.get("/")
@@ -4,7 +4,7 @@ from datetime import datetime
 
 class RAGSearchRequest(BaseModel):
     query: str = Field(..., description="Search query for transcript content")
-    top_k: int = Field(100, description="Number of top results to return", ge=1, le=2000)
+    top_k: int = Field(20, description="Number of top results to return", ge=1, le=2000)
 
 class RAGSearchResult(BaseModel):
     text: str = Field(..., description="Retrieved text segment")
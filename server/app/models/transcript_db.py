@@ -1,20 +1,33 @@
 from beanie import Document
+from pymongo import IndexModel
 from pydantic import Field
 from typing import Optional
 from datetime import datetime
 
+NO_TRANSCRIPT_SEQUENCE = -1
+NO_TRANSCRIPT_TTL_SECONDS = 24 * 60 * 60
+SEGMENT_INDEX_KEYS = [("video_id", 1), ("sequence", 1)]
+SEGMENT_INDEX_NAME = "video_id_sequence_unique"
+# Auto-generated name of the non-unique index older releases created on SEGMENT_INDEX_KEYS
+LEGACY_SEGMENT_INDEX_NAME = "video_id_1_sequence_1"
+
 class TranscriptSegmentDB(Document):
     """MongoDB document for storing video ID and transcript segments"""
     video_id: str = Field(..., description="YouTube video ID")
     sequence: int = Field(..., description="Order of segment in the transcript")
     text: str = Field(..., description="Transcript text for this segment")
     timestamp: Optional[float] = Field(None, description="Timestamp in seconds")
+    language: Optional[str] = Field(None, description="Language code the transcript was extracted in")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
         name = "transcript_segments"
         indexes = [
-            "video_id",
-            [("video_id", 1), ("sequence", 1)],  # Compound index for efficient retrieval
+            IndexModel(SEGMENT_INDEX_KEYS, name=SEGMENT_INDEX_NAME, unique=True),  # One document per segment position
+            IndexModel(  # Expire "no transcript available" markers so those videos are retried later
+                [("created_at", 1)],
+                expireAfterSeconds=NO_TRANSCRIPT_TTL_SECONDS,
+                partialFilterExpression={"sequence": NO_TRANSCRIPT_SEQUENCE}
+            ),
             "timestamp"
         ] 
\ No newline at end of file
@@ -28,6 +28,14 @@ class TranscriptWithTimestampsResponse(BaseModel):
     segments: List[TranscriptSegment]
     metadata: dict
 
+class BulkTranscriptRequest(BaseModel):
+    video_ids: List[str]
+    language: str = "en"
+    save_to_db: bool = True
+
+class BulkTranscriptResponse(BaseModel):
+    results: List[TranscriptWithTimestampsResponse]
+
 class TranscriptResponse(BaseModel):
     video_id: str
     title: str